@@ -0,0 +1,158 @@
+# aggregation.py - rolling (location, topic, time bucket) risk aggregates for heatmaps and topic counts
+import time
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple, Union
+from config import (
+    AGG_BUCKET_SECONDS, AGG_COARSE_BUCKET_SECONDS, AGG_FINE_RETENTION, AGG_RETENTION, AGG_WINDOWS
+)
+
+Window = Union[str, float]
+
+class RollingAggregator:
+    """
+    Incremental sum / count / max of risk per (location, topic, time bucket).
+    add() is O(1). Recent data sits in AGG_BUCKET_SECONDS buckets; once
+    older than AGG_FINE_RETENTION they are compacted into
+    AGG_COARSE_BUCKET_SECONDS buckets, and dropped after AGG_RETENTION, so
+    memory is bounded by the number of live buckets however long the process
+    runs. Window queries ("15m", "1h", "24h" or seconds) are cached until the
+    next write or bucket boundary. Fine buckets that overlap the window count
+    (at most one AGG_BUCKET_SECONDS of extra data); coarse buckets only if
+    they start inside it, so an hour-wide bucket never stretches a "1h" view
+    to two hours. Returned dicts are
+    shared with the cache and must not be mutated.
+    """
+
+    def __init__(self, bucket_seconds: int = AGG_BUCKET_SECONDS,
+                 coarse_bucket_seconds: int = AGG_COARSE_BUCKET_SECONDS,
+                 fine_retention: int = AGG_FINE_RETENTION, retention: int = AGG_RETENTION):
+        self.bucket_seconds = bucket_seconds
+        self.coarse_bucket_seconds = coarse_bucket_seconds
+        self.fine_retention = fine_retention
+        self.retention = retention
+        self.version = 0
+        # (bucket start, bucket width) -> {(location, topic): [sum, count, max]}
+        self._buckets: Dict[Tuple[float, int], Dict[Tuple[str, str], list]] = {}
+        self._results: Dict[tuple, tuple] = {}
+        self._lock = Lock()
+
+    def _bucket_key(self, ts: float, now: float) -> Tuple[float, int]:
+        width = self.bucket_seconds if ts > now - self.fine_retention else self.coarse_bucket_seconds
+        return ts - ts % width, width
+
+    def add(self, location: str, topic: str, risk: float, ts: Optional[float] = None):
+        """Record one scored item; `ts` defaults to now."""
+        now = time.time()
+        ts = now if ts is None else ts
+        if ts <= now - self.retention:
+            return
+        key = self._bucket_key(ts, now)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = {}
+                self._compact(now)  # a new bucket is when older ones can roll over
+            agg = bucket.get((location, topic))
+            if agg is None:
+                bucket[(location, topic)] = [risk, 1, risk]
+            else:
+                agg[0] += risk
+                agg[1] += 1
+                if risk > agg[2]:
+                    agg[2] = risk
+            self.version += 1
+
+    def compact(self, now: Optional[float] = None):
+        """Merge fine buckets past AGG_FINE_RETENTION into coarse ones; drop those past AGG_RETENTION."""
+        with self._lock:
+            self._compact(time.time() if now is None else now)
+
+    def _compact(self, now: float):
+        for key in list(self._buckets):
+            start, width = key
+            end = start + width
+            if end <= now - self.retention:
+                del self._buckets[key]
+            elif width == self.bucket_seconds and end <= now - self.fine_retention:
+                coarse = self._buckets.setdefault((start - start % self.coarse_bucket_seconds,
+                                                   self.coarse_bucket_seconds), {})
+                for group, (total, count, peak) in self._buckets.pop(key).items():
+                    agg = coarse.get(group)
+                    if agg is None:
+                        coarse[group] = [total, count, peak]
+                    else:
+                        agg[0] += total
+                        agg[1] += count
+                        agg[2] = max(agg[2], peak)
+        self.version += 1
+
+    def _rollup(self, seconds: float, now: float) -> Dict[Tuple[str, str], list]:
+        """(location, topic) -> [sum, count, max] over the buckets in the last `seconds` (see class doc)."""
+        totals: Dict[Tuple[str, str], list] = {}
+        window_start = now - seconds
+        for (start, width), bucket in self._buckets.items():
+            if start + width <= window_start:
+                continue
+            if width != self.bucket_seconds and start < window_start:
+                continue
+            for group, (total, count, peak) in bucket.items():
+                agg = totals.get(group)
+                if agg is None:
+                    totals[group] = [total, count, peak]
+                else:
+                    agg[0] += total
+                    agg[1] += count
+                    agg[2] = max(agg[2], peak)
+        return totals
+
+    def _cached(self, kind: str, window: Window, build) -> dict:
+        seconds = AGG_WINDOWS[window] if isinstance(window, str) else window
+        now = time.time()
+        tick = now - now % self.bucket_seconds
+        with self._lock:
+            hit = self._results.get((kind, seconds))
+            if hit is not None and hit[0] == self.version and hit[1] == tick:
+                return hit[2]
+            result = build(self._rollup(seconds, now))
+            self._results[(kind, seconds)] = (self.version, tick, result)
+            return result
+
+    def by_location(self, window: Window = "1h") -> Dict[str, Dict[str, float]]:
+        """Per location: average and max risk and item count within the window."""
+        def build(totals):
+            per_loc: Dict[str, list] = {}
+            for (loc, _), (total, count, peak) in totals.items():
+                agg = per_loc.setdefault(loc, [0.0, 0, 0.0])
+                agg[0] += total
+                agg[1] += count
+                agg[2] = max(agg[2], peak)
+            return {
+                loc: {"avg": round(total / count, 4), "max": round(peak, 4), "count": count}
+                for loc, (total, count, peak) in per_loc.items()
+            }
+        return self._cached("location", window, build)
+
+    def heatmap(self, window: Window = "1h", exclude: Iterable[str] = ()) -> Dict[str, float]:
+        """Average risk per location within the window, rounded for display."""
+        exclude = set(exclude)
+        return {
+            loc: round(stats["avg"], 2) for loc, stats in self.by_location(window).items()
+            if loc not in exclude
+        }
+
+    def topic_counts(self, window: Window = "24h") -> Dict[str, Dict[str, int]]:
+        """Items per location and topic within the window."""
+        def build(totals):
+            counts: Dict[str, Dict[str, int]] = {}
+            for (loc, topic), (_, count, _) in totals.items():
+                counts.setdefault(loc, {})[topic] = count
+            return counts
+        return self._cached("topics", window, build)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "buckets": len(self._buckets),
+                "groups": sum(len(b) for b in self._buckets.values()),
+                "version": self.version
+            }
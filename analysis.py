@@ -0,0 +1,61 @@
+# analysis.py - one spaCy parse per document, shared by claims, geo and topic extraction
+import hashlib
+from typing import List, Optional, Tuple
+from cache import TTLCache
+from config import ANALYSIS_CACHE_SIZE, ANALYSIS_MAX_CHARS, SPACY_BATCH_SIZE, SPACY_N_PROCESS
+from models import get_spacy_model
+
+class DocAnalysis:
+    """The parts of a spaCy Doc the scorers use, detached from the Doc itself."""
+    __slots__ = ("text", "sentences", "noun_chunks", "entities")
+
+    def __init__(self, doc):
+        self.text = doc.text
+        # (sentence text, sentence contains a named entity)
+        self.sentences: List[Tuple[str, bool]] = [(sent.text, bool(sent.ents)) for sent in doc.sents]
+        self.noun_chunks: List[str] = [str(nc) for nc in doc.noun_chunks]
+        # (entity text, label, start char)
+        self.entities: List[Tuple[str, str, int]] = [(ent.text, ent.label_, ent.start_char) for ent in doc.ents]
+
+    def gpes(self, within: Optional[int] = None) -> List[str]:
+        """GPE entity texts, optionally only those starting in the first `within` chars."""
+        return [
+            text for text, label, start in self.entities
+            if label == "GPE" and (within is None or start < within)
+        ]
+
+# Analyses are plain Python objects, so this cache is memory-only
+_analysis_cache = TTLCache(maxsize=ANALYSIS_CACHE_SIZE, ttl=24 * 3600, table="analysis")
+
+def _key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def analyze_doc(text: str) -> DocAnalysis:
+    """Parse (or fetch the cached parse of) the first ANALYSIS_MAX_CHARS of text."""
+    return analyze_docs([text])[0]
+
+def analyze_docs(texts: List[str]) -> List[DocAnalysis]:
+    """
+    Bulk variant of analyze_doc: cache misses go through nlp.pipe with
+    SPACY_BATCH_SIZE / SPACY_N_PROCESS, everything else is served from cache.
+    """
+    texts = [t[:ANALYSIS_MAX_CHARS] for t in texts]
+    keys = [_key(t) for t in texts]
+    results = [_analysis_cache.get(k) for k in keys]
+
+    misses = {}
+    for i, (key, res) in enumerate(zip(keys, results)):
+        if res is None:
+            misses.setdefault(key, []).append(i)
+
+    if misses:
+        nlp = get_spacy_model()
+        miss_texts = [texts[idxs[0]] for idxs in misses.values()]
+        docs = nlp.pipe(miss_texts, batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS)
+        for (key, idxs), doc in zip(misses.items(), docs):
+            analysis = DocAnalysis(doc)
+            _analysis_cache.set(key, analysis)
+            for i in idxs:
+                results[i] = analysis
+
+    return results
@@ -2,10 +2,9 @@
 import streamlit as st
 from threading import Thread, Event
 import time
-from datetime import datetime
 from fetchers import fetch_all
-from scorer import compute_risk
-from store import push_event, get_recent, increment_geo_topic, get_geo_topic_counts
+from stream_pipeline import run_cycle
+from store import get_snapshot, get_geo_topic_counts
 from config import FETCH_INTERVAL_SECONDS, RISK_THRESHOLD, USE_HEAVY_MODELS
 
 st.set_page_config(layout='wide', page_title='Misinfo EarlyAlert')
@@ -16,18 +15,9 @@ def background_loop():
     # runs in separate thread
     while not stop_event.is_set():
         try:
-            items = fetch_all()
-            for item in items:
-                res = compute_risk(item)
-                item.update(res)
-                item['scanned_at'] = datetime.utcnow().isoformat()
-                # simple topic: first claim or title keywords
-                topic = (res['claims'][0] if res.get('claims') else (item.get('title') or '')).split(':')[0][:80]
-                location = "Unknown"
-                push_event({**item, 'topic': topic, 'location': location})
-                # update geo-topic counts (here loc unknown -> skip)
-                increment_geo_topic(location, topic)
-            # sleep
+            # only entries not pushed in an earlier cycle; each one reaches the
+            # store as soon as it is scored instead of after the whole cycle
+            run_cycle(only_new=True, stop_event=stop_event)
         except Exception as e:
             print("Background error:", e)
         for _ in range(int(FETCH_INTERVAL_SECONDS/2)):
@@ -58,9 +48,17 @@ with col2:
         items = fetch_all()
         st.write(f"Fetched {len(items)} items")
 
+# one lock-free snapshot per rerun, so every panel shows the same state
+snapshot = get_snapshot()
+if st.session_state.get('store_version') != snapshot.version:
+    # derived views are rebuilt only when the store changed since the last rerun
+    st.session_state['rows'] = [evt for _, evt in snapshot.events[:50]]
+    st.session_state['alerts'] = [evt for _, evt in snapshot.events[:200] if evt.get('risk_score',0) >= RISK_THRESHOLD]
+    st.session_state['store_version'] = snapshot.version
+
 with col1:
     st.markdown("### Live Feed (most recent)")
-    rows = get_recent(50)
+    rows = st.session_state['rows']
     if not rows:
         st.info("No scanned items yet — open the app and wait ~1 minute or Force fetch.")
     for r in rows[:50]:
@@ -81,13 +79,13 @@ with col1:
             container.write(f"{r.get('url')}")
 
 st.sidebar.header("Alerts")
-alerts = [r for r in get_recent(200) if r.get('risk_score',0) >= RISK_THRESHOLD]
+alerts = st.session_state['alerts']
 st.sidebar.write(f"Active alerts: {len(alerts)}")
 for a in alerts[:20]:
     st.sidebar.write(f"- [{a.get('topic')}] {a.get('title')[:80]} - {a.get('risk_score'):.2f}")
 
-st.sidebar.header("Geo-topic counts (sample)")
-st.sidebar.json(get_geo_topic_counts())
+st.sidebar.header("Geo-topic counts (last 24h)")
+st.sidebar.json(get_geo_topic_counts("24h"))
 
 st.markdown("---")
 st.caption("Built for hackathon demo. This is a minimal MVP — expand models, add geo extraction, and webhooks for production.")
@@ -1,10 +1,15 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
-from scorer import compute_risk
-from utils.geo import detect_geolocation
+from scorer import compute_risk_batch
+from utils.geo import detect_geolocation_async
+from batching import MicroBatcher
+from executors import inference_executor, guarded
 
 app = FastAPI()
 
+# Concurrent requests are scored together through compute_risk_batch
+risk_batcher = MicroBatcher(compute_risk_batch, name="compute_risk", executor=inference_executor)
+
 class Post(BaseModel):
     title: str
     text: str = ""
@@ -13,8 +18,12 @@ class Post(BaseModel):
 
 @app.post("/analyze")
 async def analyze(post: Post):
-    risk = compute_risk(post.dict())
-    geo = detect_geolocation(post.url)
+    return await guarded(_analyze(post))
+
+async def _analyze(post: Post):
+    # Geolocation is answered offline / from cache; unknown domains are looked up in the background
+    geo = await detect_geolocation_async(post.url)
+    risk = await risk_batcher.submit(post.dict())
 
     return {
         "risk": risk,
@@ -1,10 +1,12 @@
 import uvicorn
-from fastapi import FastAPI, HTTPException, Body, Query
+from fastapi import FastAPI, HTTPException, Body, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Set
 import time
 import random
+import asyncio
 import requests
 import logging
 from datetime import datetime
@@ -12,6 +14,7 @@ import feedparser
 from bs4 import BeautifulSoup
 import re
 from collections import Counter
+from concurrent.futures import Future
 
 # Import actual ML models
 from models import (
@@ -23,6 +26,14 @@ from models import (
     check_models_available
 )
 from fetchers import fetch_all
+from analysis import analyze_doc, analyze_docs
+from scorer import _as_list
+from batching import MicroBatcher
+from broadcast import Broadcaster
+from aggregation import RollingAggregator
+from risk_kernel import risk_from_components
+from executors import io_executor, inference_executor, guarded, QueueFullError
+from config import SCORING_BATCH_SIZE, FEED_REFRESH_TIMEOUT_SECONDS, FEED_REFRESH_SECONDS, HEATMAP_WINDOW, AGG_WINDOWS
 
 # --- CONFIGURATION ---
 # Set to FALSE to load actual HuggingFace models (Requires ~4GB RAM + PyTorch)
@@ -93,8 +104,29 @@ class NewsItem(BaseModel):
 class MLEngine:
     def __init__(self, mock_mode=False):
         self.mock_mode = mock_mode
-        self.cached_feed = []
-        self.last_fetch = 0
+        # Last complete feed + heatmap, replaced as a whole by the background refresher
+        self.snapshot = {"items": [], "heatmap": {}, "generated_at": 0.0, "cursor": 0}
+        # Pushes snapshot changes to /stream clients
+        self.broadcaster = Broadcaster()
+        # Rolling risk per (geolocation, source); /heatmap reads from it
+        self.aggregates = RollingAggregator()
+        self._refresh_lock = asyncio.Lock()
+        # Strong reference to the background refresh started by fetch_feeds (the loop only keeps weak ones)
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Executor future of the running refresh stage; a timed-out refresh keeps its thread until it returns
+        self._refresh_future: Optional[Future] = None
+        
+        # Concurrent /analyze requests share forward passes through these
+        self.fake_news_batcher = MicroBatcher(
+            lambda texts: _as_list(self.fake_news_clf(texts, batch_size=SCORING_BATCH_SIZE)),
+            name="fake_news",
+            executor=inference_executor
+        )
+        self.sentiment_batcher = MicroBatcher(
+            lambda texts: _as_list(self.sentiment_clf(texts, batch_size=SCORING_BATCH_SIZE)),
+            name="sentiment",
+            executor=inference_executor
+        )
         
         if not self.mock_mode:
             logger.info("Loading ML Models (this may take a while)...")
@@ -128,8 +160,7 @@ class MLEngine:
             return "Global"
         
         try:
-            doc = self.nlp(text[:500])
-            gpes = [ent.text for ent in doc.ents if ent.label_ == "GPE"]
+            gpes = analyze_doc(text).gpes(within=500)
             if gpes:
                 return gpes[0]
         except Exception as e:
@@ -144,8 +175,8 @@ class MLEngine:
             return sentences[:3]
         
         try:
-            doc = self.nlp(text[:1000])
-            claims = [sent.text.strip() for sent in doc.sents if len(sent.text) > 10]
+            doc = analyze_doc(text)
+            claims = [sent.strip() for sent, _ in doc.sentences if len(sent) > 10]
             return claims[:5]
         except Exception as e:
             logger.debug(f"Error extracting claims: {e}")
@@ -153,107 +184,150 @@ class MLEngine:
 
     def analyze_text(self, text: str, source: str = "") -> Dict:
         """Main scoring logic with real ML models."""
+        return self.analyze_texts([text], [source])[0]
+
+    def analyze_texts(self, texts: List[str], sources: Optional[List[str]] = None) -> List[Dict]:
+        """Batched scoring: one padded forward pass per model for all texts."""
+        if not texts:
+            return []
+        sources = sources or [""] * len(texts)
+
         if self.mock_mode:
-            # Mock mode fallback
-            risk = 0.1
-            trigger_words = ['shocking', 'died', 'plot', 'virus', 'secret', 'banned', 'crisis']
-            sensationalism = sum(1 for w in trigger_words if w in text.lower()) * 0.15
-            
-            if "reddit" in source.lower():
-                risk += 0.1
-            
-            risk += sensationalism
-            risk = min(0.95, risk)
-            
-            return {
-                "risk_score": round(risk, 2),
-                "fake_news_score": round(risk * 0.8, 2),
-                "sensationalism": round(min(0.9, sensationalism + 0.1), 2),
-                "confidence": 0.5,
-                "reasoning": "Detected high usage of emotive language." if risk > 0.5 else "Content appears neutral."
-            }
+            return [self._mock_metrics(text, source) for text, source in zip(texts, sources)]
 
         # === REAL ML INFERENCE ===
         try:
+            inputs = [text[:512] for text in texts]
             # 1. Fake News Detection
-            fn_input = text[:512]
-            fn_result = self.fake_news_clf(fn_input)[0]
-            fn_label = fn_result['label'].upper()
-            fn_score = fn_result['score']
-            
-            # If labeled as "REAL", invert score (lower is better)
-            # If labeled as "FAKE", use score as is
-            fake_news_score = fn_score if "FAKE" in fn_label else (1 - fn_score)
-            
+            fn_results = _as_list(self.fake_news_clf(inputs, batch_size=SCORING_BATCH_SIZE))
             # 2. Sentiment Analysis (negative sentiment = higher sensationalism risk)
-            sent_result = self.sentiment_clf(fn_input)[0]
-            sent_label = sent_result['label'].upper()
-            sent_score = sent_result['score']
-            
-            # LABEL_0 = Negative, LABEL_1 = Neutral, LABEL_2 = Positive
-            # Higher sensationalism if negative or strongly positive
-            if "LABEL_0" in sent_label or "NEGATIVE" in sent_label:
-                sensationalism_score = sent_score
-            elif "LABEL_2" in sent_label or "POSITIVE" in sent_label:
-                sensationalism_score = sent_score * 0.6  # Positive isn't always sensational
-            else:
-                sensationalism_score = 0.2  # Neutral is low risk
-            
-            # 3. Source credibility heuristic
-            source_cred = 0.5
-            trusted_sources = ["BBC", "Reuters", "AP News", "Guardian", "NPR"]
-            questionable_sources = ["InfoWars", "Breitbart", "Natural News"]
-            
-            for trusted in trusted_sources:
-                if trusted.lower() in source.lower():
-                    source_cred = 0.85
-                    break
-            
-            for questionable in questionable_sources:
-                if questionable.lower() in source.lower():
-                    source_cred = 0.3
-                    break
-            
-            # 4. Compute final risk score
-            # Weights: fake news (40%), sensationalism (35%), source credibility (25%)
-            risk_score = (
-                fake_news_score * 0.40 +
-                sensationalism_score * 0.35 +
-                (1 - source_cred) * 0.25
-            )
-            
-            risk_score = min(1.0, max(0.0, risk_score))
-            
-            reasoning = (
-                f"Fake News Risk: {fake_news_score:.2f} (Model: {fn_label}), "
-                f"Sensationalism: {sensationalism_score:.2f}, "
-                f"Source Credibility: {source_cred:.2f}"
+            sent_results = _as_list(self.sentiment_clf(inputs, batch_size=SCORING_BATCH_SIZE))
+
+            return self._with_risk([
+                self._metrics_from_outputs(fn_result, sent_result, source)
+                for fn_result, sent_result, source in zip(fn_results, sent_results, sources)
+            ])
+
+        except Exception as e:
+            logger.error(f"Error in model inference: {e}")
+            logger.warning("Falling back to heuristic analysis")
+            return [self._fallback_metrics(text) for text in texts]
+
+    async def analyze_text_async(self, text: str, source: str = "") -> Dict:
+        """analyze_text for request handlers: inference is micro-batched with concurrent requests."""
+        if self.mock_mode:
+            return self._mock_metrics(text, source)
+
+        try:
+            fn_input = text[:512]
+            fn_result, sent_result = await asyncio.gather(
+                self.fake_news_batcher.submit(fn_input),
+                self.sentiment_batcher.submit(fn_input)
             )
-            
-            return {
-                "risk_score": round(risk_score, 3),
-                "fake_news_score": round(fake_news_score, 3),
-                "sensationalism": round(sensationalism_score, 3),
-                "source_credibility": round(source_cred, 3),
-                "confidence": round(fn_score, 3),
-                "reasoning": reasoning
-            }
-        
+            return self._with_risk([self._metrics_from_outputs(fn_result, sent_result, source)])[0]
+        except QueueFullError:
+            raise  # overload is the caller's to report (429), not a model failure
         except Exception as e:
             logger.error(f"Error in model inference: {e}")
             logger.warning("Falling back to heuristic analysis")
-            # Fallback heuristic
-            risk = 0.3
-            if any(w in text.lower() for w in ['shocking', 'breaking', 'viral']):
-                risk += 0.2
-            return {
-                "risk_score": min(0.95, risk),
-                "fake_news_score": 0.5,
-                "sensationalism": 0.3,
-                "source_credibility": 0.5,
-                "confidence": 0.0,
-                "reasoning": "Using fallback heuristic analysis"
-            }
+            return self._fallback_metrics(text)
+
+    def _mock_metrics(self, text: str, source: str) -> Dict:
+        """Mock mode fallback."""
+        risk = 0.1
+        trigger_words = ['shocking', 'died', 'plot', 'virus', 'secret', 'banned', 'crisis']
+        sensationalism = sum(1 for w in trigger_words if w in text.lower()) * 0.15
+        
+        if "reddit" in source.lower():
+            risk += 0.1
+        
+        risk += sensationalism
+        risk = min(0.95, risk)
+        
+        return {
+            "risk_score": round(risk, 2),
+            "fake_news_score": round(risk * 0.8, 2),
+            "sensationalism": round(min(0.9, sensationalism + 0.1), 2),
+            "confidence": 0.5,
+            "reasoning": "Detected high usage of emotive language." if risk > 0.5 else "Content appears neutral."
+        }
+
+    def _metrics_from_outputs(self, fn_result: Dict, sent_result: Dict, source: str) -> Dict:
+        """One item's fake-news and sentiment outputs as risk components (risk itself: _with_risk)."""
+        fn_label = fn_result['label'].upper()
+        fn_score = fn_result['score']
+        
+        # If labeled as "REAL", invert score (lower is better)
+        # If labeled as "FAKE", use score as is
+        fake_news_score = fn_score if "FAKE" in fn_label else (1 - fn_score)
+        
+        sent_label = sent_result['label'].upper()
+        sent_score = sent_result['score']
+        
+        # LABEL_0 = Negative, LABEL_1 = Neutral, LABEL_2 = Positive
+        # Higher sensationalism if negative or strongly positive
+        if "LABEL_0" in sent_label or "NEGATIVE" in sent_label:
+            sensationalism_score = sent_score
+        elif "LABEL_2" in sent_label or "POSITIVE" in sent_label:
+            sensationalism_score = sent_score * 0.6  # Positive isn't always sensational
+        else:
+            sensationalism_score = 0.2  # Neutral is low risk
+        
+        # 3. Source credibility heuristic
+        source_cred = 0.5
+        trusted_sources = ["BBC", "Reuters", "AP News", "Guardian", "NPR"]
+        questionable_sources = ["InfoWars", "Breitbart", "Natural News"]
+        
+        for trusted in trusted_sources:
+            if trusted.lower() in source.lower():
+                source_cred = 0.85
+                break
+        
+        for questionable in questionable_sources:
+            if questionable.lower() in source.lower():
+                source_cred = 0.3
+                break
+        
+        reasoning = (
+            f"Fake News Risk: {fake_news_score:.2f} (Model: {fn_label}), "
+            f"Sensationalism: {sensationalism_score:.2f}, "
+            f"Source Credibility: {source_cred:.2f}"
+        )
+        
+        return {
+            "fake_news_score": round(fake_news_score, 3),
+            "sensationalism": round(sensationalism_score, 3),
+            "source_credibility": round(source_cred, 3),
+            "confidence": round(fn_score, 3),
+            "reasoning": reasoning
+        }
+
+    @staticmethod
+    def _with_risk(metrics: List[Dict]) -> List[Dict]:
+        """
+        Final risk for a batch of metrics through the shared risk_kernel
+        (same weights and calibration as scorer.compute_risk). Contradiction
+        and virality aren't computed here, so their weight is renormalized away.
+        """
+        risks = risk_from_components([
+            {"fake_news": m["fake_news_score"], "sensational": m["sensationalism"], "source": m["source_credibility"]}
+            for m in metrics
+        ])
+        return [{"risk_score": round(risk, 3), **m} for risk, m in zip(risks, metrics)]
+
+    def _fallback_metrics(self, text: str) -> Dict:
+        """Fallback heuristic."""
+        risk = 0.3
+        if any(w in text.lower() for w in ['shocking', 'breaking', 'viral']):
+            risk += 0.2
+        return {
+            "risk_score": min(0.95, risk),
+            "fake_news_score": 0.5,
+            "sensationalism": 0.3,
+            "source_credibility": 0.5,
+            "confidence": 0.0,
+            "reasoning": "Using fallback heuristic analysis"
+        }
 
     def clean_html(self, html_content):
         """Remove HTML tags from content."""
@@ -261,27 +335,113 @@ class MLEngine:
         return soup.get_text()
 
     async def fetch_feeds(self):
-        """Fetches from multiple real news sources and runs analysis."""
-        current_time = time.time()
-        
-        # Cache for 5 minutes
-        if current_time - self.last_fetch < 300 and self.cached_feed:
-            logger.info("Using cached feed")
-            return self.cached_feed
-
+        """Latest feed snapshot; never waits for a refresh (stale-while-revalidate)."""
+        stale = time.time() - self.snapshot["generated_at"] >= FEED_REFRESH_SECONDS
+        idle = (self._refresh_task is None or self._refresh_task.done()) and not self.refreshing()
+        if stale and idle:
+            self._refresh_task = asyncio.get_running_loop().create_task(self.refresh_snapshot())
+        return self.snapshot["items"]
+
+    def refreshing(self) -> bool:
+        """True while a refresh runs, including one whose await timed out but whose thread has not returned."""
+        return self._refresh_lock.locked() or (self._refresh_future is not None and not self._refresh_future.done())
+
+    async def _run_refresh_stage(self, executor, fn, *args, timeout: float):
+        """Run one blocking refresh stage on `executor`, remembering its future past a timeout."""
+        self._refresh_future = executor.submit(fn, *args)
+        return await asyncio.wait_for(asyncio.wrap_future(self._refresh_future), max(timeout, 0))
+
+    async def refresh_snapshot(self):
+        """Rebuild feed + heatmap snapshot. Single-flight: concurrent calls are no-ops."""
+        if self.refreshing():
+            return
+        async with self._refresh_lock:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + FEED_REFRESH_TIMEOUT_SECONDS
+            try:
+                # Feed I/O on the I/O executor, model + spaCy inference on the inference executor
+                batch = await self._run_refresh_stage(io_executor, self.fetch_feed_batch,
+                                                      timeout=deadline - loop.time())
+                items = await self._run_refresh_stage(inference_executor, self.score_feed, batch,
+                                                      timeout=deadline - loop.time())
+            except Exception as e:
+                logger.error(f"Feed refresh failed, keeping previous snapshot: {e!r}")
+                return
+            if items or not self.snapshot["items"]:
+                previous_ids = {item["id"] for item in self.snapshot["items"]}
+                new_items = [item for item in items if item["id"] not in previous_ids]
+                for item in new_items:
+                    self.aggregates.add(item["geolocation"], item["source"], item["risk_score"])
+                removed_ids = previous_ids - {item["id"] for item in items}
+                heatmap = self.heatmap()
+                self.publish_changes(new_items, removed_ids, heatmap)
+                self.snapshot = {
+                    "items": items,
+                    "heatmap": heatmap,
+                    "generated_at": time.time(),
+                    "cursor": self.broadcaster.seq
+                }
+
+    def publish_changes(self, new_items: List[Dict], removed_ids: Set[str], heatmap: Dict[str, float]):
+        """
+        Stream the difference to the last snapshot: items that dropped out of
+        it, new items, then the heatmap entries that changed (None = removed).
+        """
+        if removed_ids:
+            self.broadcaster.publish("removed", {"removed": sorted(removed_ids)})
+        for item in new_items:
+            self.broadcaster.publish("item", item)
+        old_heatmap = self.snapshot["heatmap"]
+        delta = {geo: risk for geo, risk in heatmap.items() if old_heatmap.get(geo) != risk}
+        delta.update({geo: None for geo in old_heatmap if geo not in heatmap})
+        if delta:
+            self.broadcaster.publish("heatmap", delta)
+
+    async def refresher_loop(self):
+        """Keep the snapshot warm so requests never pay for fetch + scoring."""
+        while True:
+            await self.refresh_snapshot()
+            await asyncio.sleep(FEED_REFRESH_SECONDS)
+
+    def heatmap(self, window: str = HEATMAP_WINDOW) -> Dict[str, float]:
+        """Average risk per geolocation over a sliding window, from the rolling aggregates."""
+        return self.aggregates.heatmap(window, exclude=("Global",))
+
+    def snapshot_headers(self, response: Response):
+        generated_at = self.snapshot["generated_at"]
+        response.headers["X-Generated-At"] = datetime.fromtimestamp(generated_at).isoformat() if generated_at else ""
+        response.headers["X-Snapshot-Age"] = str(round(time.time() - generated_at)) if generated_at else ""
+        # resume point for /stream: the snapshot already includes every event up to it
+        response.headers["X-Stream-Cursor"] = str(self.snapshot["cursor"])
+
+    def fetch_feed_batch(self) -> List[Dict]:
+        """Blocking fetch of the items to score this cycle."""
         logger.info("Fetching real news from multiple sources...")
-        news_items = []
-        
         try:
             # Fetch from all sources using the enhanced fetchers
             all_items = fetch_all(include_questionable=True)
+        except Exception as e:
+            logger.error(f"Error fetching feeds: {e}")
+            return []
+        return all_items[:30]  # Process top 30 items
+
+    def score_feed(self, batch: List[Dict]) -> List[Dict]:
+        """Blocking model + spaCy scoring of a fetched batch into feed items."""
+        news_items = []
+        
+        try:
+            texts = [f"{item['title']} {item['text']}" for item in batch]
             
-            for item in all_items[:30]:  # Process top 30 items
+            # Analyze content with real models, one batch for the whole cycle
+            all_metrics = self.analyze_texts(texts, [item['source'] for item in batch])
+            if not self.mock_mode and self.nlp:
+                try:
+                    analyze_docs(texts)  # one bulk spaCy pass; extract_geo reads the cached parses
+                except Exception as e:
+                    logger.debug(f"Bulk spaCy parse failed: {e}")
+            
+            for item, text_content, metrics in zip(batch, texts, all_metrics):
                 try:
-                    text_content = f"{item['title']} {item['text']}"
-                    
-                    # Analyze content with real models
-                    metrics = self.analyze_text(text_content, item['source'])
                     geo = self.extract_geo(text_content)
                     
                     # Use image if available, otherwise fallback
@@ -306,14 +466,12 @@ class MLEngine:
                     continue
         
         except Exception as e:
-            logger.error(f"Error fetching feeds: {e}")
+            logger.error(f"Error scoring feeds: {e}")
             return []
 
         # Sort by risk score (descending)
         news_items.sort(key=lambda x: x['risk_score'], reverse=True)
         
-        self.cached_feed = news_items
-        self.last_fetch = current_time
         logger.info(f"Processed {len(news_items)} news items")
         
         return news_items
@@ -328,10 +486,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Generated-At", "X-Snapshot-Age", "X-Stream-Cursor"],
 )
 
 ml_engine = MLEngine(mock_mode=USE_MOCK_MODELS)
 
+@app.on_event("startup")
+async def start_feed_refresher():
+    app.state.feed_refresher = asyncio.get_running_loop().create_task(ml_engine.refresher_loop())
+
 # --- ROUTES ---
 
 @app.get("/")
@@ -359,12 +522,15 @@ def get_models_info():
 
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze_content(request: AnalyzeRequest):
-    # 1. Extract Info
-    claims = ml_engine.extract_claims(request.text)
-    geo = ml_engine.extract_geo(request.text)
+    return await guarded(_analyze(request))
+
+async def _analyze(request: AnalyzeRequest):
+    # 1. Extract Info (spaCy parsing is CPU bound, keep it off the event loop)
+    claims = await inference_executor.run(ml_engine.extract_claims, request.text)
+    geo = await inference_executor.run(ml_engine.extract_geo, request.text)
     
     # 2. Compute Risk
-    metrics = ml_engine.analyze_text(request.text)
+    metrics = await ml_engine.analyze_text_async(request.text)
     
     # 3. Determine Level
     score = metrics["risk_score"]
@@ -392,34 +558,50 @@ async def analyze_content(request: AnalyzeRequest):
     }
 
 @app.get("/feed", response_model=List[NewsItem])
-async def get_feed():
-    return await ml_engine.fetch_feeds()
+async def get_feed(response: Response):
+    items = await ml_engine.fetch_feeds()
+    ml_engine.snapshot_headers(response)
+    return items
 
 @app.get("/heatmap")
-async def get_heatmap():
-    """Aggregates risk scores by Geolocation from current feed."""
-    items = await ml_engine.fetch_feeds()
-    
-    geo_risk = {}
-    geo_counts = {}
-    
-    for item in items:
-        geo = item['geolocation']
-        if geo == "Global": continue
-        
-        if geo not in geo_risk:
-            geo_risk[geo] = 0.0
-            geo_counts[geo] = 0
-        
-        geo_risk[geo] += item['risk_score']
-        geo_counts[geo] += 1
-        
-    # Calculate average
-    result = {}
-    for geo in geo_risk:
-        result[geo] = round(geo_risk[geo] / geo_counts[geo], 2)
-        
-    return result
+async def get_heatmap(response: Response, window: str = Query(HEATMAP_WINDOW)):
+    """Average risk by Geolocation over a sliding window ("15m", "1h" or "24h")."""
+    if window not in AGG_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {list(AGG_WINDOWS)}")
+    await ml_engine.fetch_feeds()
+    ml_engine.snapshot_headers(response)
+    if window == HEATMAP_WINDOW:
+        return ml_engine.snapshot["heatmap"]
+    return ml_engine.heatmap(window)
+
+@app.get("/feed/status")
+def get_feed_status():
+    """Freshness of the served feed snapshot."""
+    generated_at = ml_engine.snapshot["generated_at"]
+    return {
+        "generated_at": datetime.fromtimestamp(generated_at).isoformat() if generated_at else None,
+        "age": round(time.time() - generated_at, 1) if generated_at else None,
+        "items": len(ml_engine.snapshot["items"]),
+        "refreshing": ml_engine.refreshing(),
+        "stream": ml_engine.broadcaster.stats(),
+        "aggregates": ml_engine.aggregates.stats()
+    }
+
+@app.get("/stream")
+async def stream(request: Request, cursor: Optional[int] = Query(None)):
+    """
+    Server-sent events: "item" for each newly scored feed item and "heatmap"
+    for changed heatmap entries. Resumes after the Last-Event-ID header (sent
+    by EventSource on reconnect) or ?cursor= (X-Stream-Cursor of /feed).
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        cursor = int(last_event_id)
+    return StreamingResponse(
+        ml_engine.broadcaster.subscribe(cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
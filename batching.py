@@ -0,0 +1,94 @@
+# batching.py - in-process dynamic micro-batching of inference calls across concurrent requests
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional
+from config import MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS, MICROBATCH_MAX_QUEUE
+from executors import QueueFullError
+
+logger = logging.getLogger("ViralWarnSystem")
+
+class MicroBatcher:
+    """
+    Queues single inputs submitted by concurrent coroutines and runs them
+    through `batch_fn(list_of_inputs) -> list_of_results` together. A batch is
+    flushed once it holds `max_batch_size` inputs or its oldest input has
+    waited `max_wait_ms`. `batch_fn` runs on `executor` (the loop's default
+    executor if None) so inference never blocks the event loop, and each
+    caller gets back its own result or the batch's exception. More than
+    `max_queue` waiting inputs raise QueueFullError instead of queueing.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], name: str = "batcher",
+                 max_batch_size: int = MICROBATCH_MAX_SIZE, max_wait_ms: float = MICROBATCH_MAX_WAIT_MS,
+                 max_queue: int = MICROBATCH_MAX_QUEUE, executor=None):
+        self.batch_fn = batch_fn
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+        self.executor = executor
+        self.batches = 0
+        self.items = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one input and wait for its result."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            raise QueueFullError(f"{self.name} batcher has {self.max_queue} queued inputs")
+        return await future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (timeout / disconnect) don't need inference
+            batch = [(item, fut) for item, fut in batch if not fut.done()]
+            if not batch:
+                continue
+            try:
+                results = list(await loop.run_in_executor(self.executor, self.batch_fn, [item for item, _ in batch]))
+                if len(results) != len(batch):
+                    # zip would leave the extra callers waiting until their timeout
+                    raise ValueError(f"batch function returned {len(results)} results for {len(batch)} inputs")
+                for (_, fut), result in zip(batch, results):
+                    if not fut.done():
+                        fut.set_result(result)
+            except Exception as e:
+                logger.error(f"{self.name}: batch of {len(batch)} failed: {e}")
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            self.batches += 1
+            self.items += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue else 0
+        }
@@ -0,0 +1,518 @@
+# benchmark.py - reproducible throughput / latency benchmark of the fetch and scoring pipeline
+"""
+Runs the pipeline against a generated fixture corpus served by a local stub
+server (RSS feeds and the Wikipedia search API), so results don't depend on
+the network. Measures fetch_all, extract_claims, each model scorer,
+contradiction_scores and compute_risk_batch end to end, and reports
+items/sec, p50/p95/p99 latency, peak RSS and model load time for every
+backend x batch-size configuration.
+
+Usage:
+    python benchmark.py run --stub-models --output bench.json      # no model weights needed
+    python benchmark.py run --backends torch int8 --batch-sizes 1 16 32 --output bench.json
+    python benchmark.py compare baseline.json bench.json           # exit 1 on regressions
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+import torch
+import config
+# Memory-only caches: the pipeline modules read these paths at import, and a
+# benchmark must neither reuse nor fill the service's .cache/*.sqlite tiers
+config.SCORE_CACHE_PATH = config.EVIDENCE_CACHE_PATH = config.GEO_CACHE_PATH = config.SEEN_INDEX_PATH = None
+import analysis
+import fetchers
+import models
+import scorer
+from cache import TTLCache
+from config import INFERENCE_BACKENDS, NLI_MODE, USE_HEAVY_MODELS
+
+logger = logging.getLogger("ViralWarnSystem")
+
+# === Fixture corpus ===
+
+_PLACES = ["Delhi", "Mumbai", "Kerala", "London", "Paris", "Texas", "Brazil", "Tokyo", "Nairobi", "Sydney"]
+_ACTORS = ["the health ministry", "a local council", "scientists", "the central bank", "police",
+           "a celebrity", "doctors", "the election commission", "a tech company", "farmers"]
+_NEUTRAL = [
+    "{actor} in {place} announced new guidelines on Tuesday",
+    "Heavy rain is expected across {place} this weekend, officials said",
+    "{actor} published the annual report for {place}",
+    "Parliament debated a budget proposal affecting {place}",
+]
+_SENSATIONAL = [
+    "BREAKING: {actor} in {place} caught hiding miracle cure, insiders claim",
+    "SHOCKING: you won't believe what {actor} did in {place}",
+    "Leaked documents prove {actor} staged the crisis in {place}",
+    "Secret plot by {actor} exposed in {place}, share before it's deleted",
+]
+_DOMAINS = ["bbc.co.uk", "reuters.com", "apnews.com", "theguardian.com", "infowars.com",
+            "breitbart.com", "tmz.com", "thehindu.com", "ndtv.com", "example-news.com"]
+
+def fixture_corpus(size: int = 200, seed: int = 7) -> List[Dict]:
+    """Deterministic mix of neutral and sensational news entries."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        template = rng.choice(_SENSATIONAL if rng.random() < 0.4 else _NEUTRAL)
+        title = template.format(actor=rng.choice(_ACTORS), place=rng.choice(_PLACES))
+        body = " ".join(
+            rng.choice(_NEUTRAL + _SENSATIONAL).format(actor=rng.choice(_ACTORS), place=rng.choice(_PLACES)) + "."
+            for _ in range(3)
+        )
+        title = title[0].upper() + title[1:]
+        corpus.append({
+            "title": title,
+            "text": body,
+            "url": f"https://www.{rng.choice(_DOMAINS)}/news/bench-{seed}-{i}",
+            "guid": f"bench-{seed}-{i}"
+        })
+    return corpus
+
+def _rss(entries: List[Dict], name: str) -> bytes:
+    items = "".join(
+        f"<item><title>{escape(e['title'])}</title><link>{escape(e['url'])}</link>"
+        f"<guid>{escape(e['guid'])}</guid><description>{escape(e['text'])}</description>"
+        f"<pubDate>{formatdate(usegmt=True)}</pubDate></item>"
+        for e in entries
+    )
+    return (f'<?xml version="1.0"?><rss version="2.0"><channel><title>{escape(name)}</title>'
+            f"{items}</channel></rss>").encode("utf-8")
+
+# === Local stub server ===
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # listen backlog; the default 5 drops bursts of concurrent evidence lookups
+
+class StubServer:
+    """
+    Serves /feeds/<n>.xml (the corpus split across `feeds` RSS feeds) and
+    /w/api.php (Wikipedia search with deterministic hits) on localhost,
+    each response delayed by `latency_ms`.
+    """
+
+    def __init__(self, corpus: List[Dict], feeds: int = 8, latency_ms: float = 0.0):
+        self.feeds = {f"/feeds/{n}.xml": _rss(corpus[n::feeds], f"Bench feed {n}") for n in range(feeds)}
+        latency = latency_ms / 1000.0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real hosts
+
+            def do_GET(self):
+                if latency:
+                    time.sleep(latency)
+                parts = urlsplit(self.path)
+                if parts.path in server.feeds:
+                    self._send(server.feeds[parts.path], "application/rss+xml")
+                elif parts.path == "/w/api.php":
+                    query = parse_qs(parts.query).get("srsearch", [""])[0]
+                    self._send(json.dumps(_wiki_response(query)).encode(), "application/json")
+                else:
+                    self._send(b"not found", "text/plain", 404)
+
+            def _send(self, body: bytes, content_type: str, status: int = 200):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = _StubHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="bench-stub-server", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+def _wiki_response(query: str) -> Dict:
+    # roughly two thirds of queries have a hit
+    if not query or int(hashlib.sha1(query.encode()).hexdigest(), 16) % 3 == 0:
+        return {"query": {"search": []}}
+    return {"query": {"search": [{
+        "title": query.title()[:60],
+        "snippet": f"{query} is described in several reliable sources as a matter of public record."
+    }]}}
+
+def point_at_stub(stub: StubServer):
+    """Route every feed to the stub's feeds and evidence lookups to its Wikipedia API."""
+    stub_feeds = [{"name": f"Bench {n}", "url": f"{stub.url}/feeds/{n}.xml"} for n in range(len(stub.feeds))]
+    half = len(stub_feeds) // 2
+    fetchers.REPUTED_RSS_FEEDS[:] = stub_feeds[:half]
+    fetchers.INDIA_NEWS_FEEDS[:] = stub_feeds[half:]
+    fetchers.ENTERTAINMENT_FEEDS[:] = []
+    fetchers.QUESTIONABLE_RSS_FEEDS[:] = []
+    os.environ.pop("NEWSAPI_KEY", None)
+    scorer.WIKIPEDIA_API_URL = f"{stub.url}/w/api.php"
+
+def reset_caches():
+    """Fresh memory-only caches, so every run measures real work."""
+    scorer._score_cache = TTLCache(maxsize=100_000, ttl=3600, table="scores")
+    scorer._evidence_cache = TTLCache(maxsize=100_000, ttl=3600, table="evidence")
+    analysis._analysis_cache = TTLCache(maxsize=100_000, ttl=3600, table="analysis")
+    fetchers._feed_states.clear()
+
+# === Stub models ===
+
+def _unit(text: str, salt: str = "") -> float:
+    """Deterministic pseudo-score in [0, 1) for a text."""
+    return int(hashlib.sha1((salt + text).encode("utf-8")).hexdigest()[:8], 16) / 0x100000000
+
+class _StubClassifier:
+    """text-classification pipeline stand-in: label and score derived from a hash of the text."""
+
+    def __init__(self, labels: List[str], cost_ms: float):
+        self.labels = labels
+        self.cost = cost_ms / 1000.0
+
+    def __call__(self, inputs, batch_size: int = 1, **kwargs):
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        time.sleep(self.cost * len(texts))
+        out = [{"label": self.labels[int(_unit(t, "label") * len(self.labels))], "score": 0.5 + _unit(t) / 2}
+               for t in texts]
+        return out[0] if single else out
+
+class _StubZeroShot:
+    def __init__(self, cost_ms: float):
+        self.cost = cost_ms / 1000.0
+
+    def __call__(self, sequences, candidate_labels, **kwargs):
+        single = isinstance(sequences, str)
+        texts = [sequences] if single else list(sequences)
+        time.sleep(self.cost * len(texts))
+        out = []
+        for t in texts:
+            raw = [_unit(t, label) for label in candidate_labels]
+            total = sum(raw) or 1.0
+            ranked = sorted(zip(candidate_labels, [r / total for r in raw]), key=lambda x: -x[1])
+            out.append({"sequence": t, "labels": [l for l, _ in ranked], "scores": [s for _, s in ranked]})
+        return out[0] if single else out
+
+class _StubEncoding(dict):
+    def to(self, device):
+        return self
+
+class _StubTokenizer:
+    def __call__(self, first, second=None, **kwargs):
+        pairs = list(zip(first, second)) if second is not None else [(t, "") for t in first]
+        return _StubEncoding(pairs=pairs)
+
+class _StubOutput:
+    def __init__(self, logits):
+        self.logits = logits
+
+class _StubNLIModel:
+    device = "cpu"
+
+    class config:
+        id2label = {0: "CONTRADICTION", 1: "NEUTRAL", 2: "ENTAILMENT"}
+
+    def __init__(self, cost_ms: float):
+        self.cost = cost_ms / 1000.0
+
+    def __call__(self, pairs):
+        time.sleep(self.cost * len(pairs))
+        return _StubOutput(torch.tensor([[_unit(p + h, str(k)) * 4 for k in range(3)] for p, h in pairs]))
+
+class _StubEmbedder:
+    def __init__(self, cost_ms: float, dim: int = 32):
+        self.cost = cost_ms / 1000.0
+        self.dim = dim
+
+    def encode(self, texts, batch_size: int = 32, convert_to_tensor: bool = False, **kwargs):
+        time.sleep(self.cost * len(texts))
+        vectors = torch.tensor([[_unit(t, str(k)) - 0.5 for k in range(self.dim)] for t in texts])
+        return vectors if convert_to_tensor else vectors.tolist()
+
+def install_stub_models(cost_ms: float = 0.0):
+    """
+    Replace the transformer / sentence-transformer loaders with hash-based
+    stand-ins costing `cost_ms` per item. spaCy stays real (it is small).
+    """
+    models.registry.unload_all()
+    models.registry.register("fake_news", lambda: _StubClassifier(["FAKE", "REAL"], cost_ms))
+    models.registry.register("sentiment", lambda: _StubClassifier(["LABEL_0", "LABEL_1", "LABEL_2"], cost_ms))
+    models.registry.register("nli", lambda: _StubZeroShot(cost_ms))
+    models.registry.register("nli_cross_encoder", lambda: (_StubTokenizer(), _StubNLIModel(cost_ms)))
+    models.registry.register("embedding", lambda: _StubEmbedder(cost_ms))
+
+# === Measurement ===
+
+class RSSSampler:
+    """Peak resident set size while active, sampled from /proc (ru_maxrss elsewhere)."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def current() -> int:
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        scale = 1 if sys.platform == "darwin" else 1024  # bytes on macOS, KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self.current()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def measure(fn: Callable, calls: List[tuple], items_per_call: Optional[List[int]] = None,
+            before_each: Optional[Callable] = None) -> Dict:
+    """
+    Time fn(*args) for each call; latency is per call, throughput over all
+    items. Without `items_per_call` the items are counted as len(result).
+    `before_each` runs before every call, outside the timing.
+    """
+    latencies = []
+    items = 0
+    total = 0.0
+    with RSSSampler() as rss:
+        for n, args in enumerate(calls):
+            if before_each:
+                before_each()
+            t = time.perf_counter()
+            result = fn(*args)
+            latencies.append(time.perf_counter() - t)
+            total += latencies[-1]
+            items += items_per_call[n] if items_per_call is not None else len(result)
+    latencies.sort()
+    return {
+        "calls": len(calls),
+        "items": items,
+        "seconds": round(total, 4),
+        "items_per_sec": round(items / total, 2) if total else None,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "peak_rss_mb": round(rss.peak / 1e6, 1)
+    }
+
+def _batches(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def load_models() -> Dict[str, Optional[float]]:
+    """Unload everything, then time loading each model the scorer uses."""
+    models.registry.unload_all()
+    loaders = {"spacy": models.get_spacy_model, "fake_news": models.get_fake_news_model}
+    if USE_HEAVY_MODELS:
+        loaders["sentiment"] = models.get_sentiment_model
+        loaders["nli"] = models.get_nli_cross_encoder if NLI_MODE == "cross_encoder" else models.get_nli_model
+        loaders["embedding"] = models.get_embed_model
+    seconds = {}
+    for name, load in loaders.items():
+        started = time.perf_counter()
+        try:
+            load()
+            seconds[name] = round(time.perf_counter() - started, 3)
+        except Exception as e:
+            logger.error(f"Benchmark: loading {name} failed: {e}")
+            seconds[name] = None
+    return seconds
+
+def run_config(corpus: List[Dict], backend: str, batch_size: int, repeats: int) -> Dict:
+    """Every stage for one backend x batch size, on cold caches."""
+    if backend != "stub":
+        INFERENCE_BACKENDS.update({key: backend for key in INFERENCE_BACKENDS})
+    scorer.SCORING_BATCH_SIZE = batch_size
+    with RSSSampler() as rss:
+        load_seconds = load_models()
+    stages = {}
+
+    texts = [scorer._post_text(p) for p in corpus]
+    batches = _batches(texts, batch_size)
+    sizes = [len(b) for b in batches]
+
+    # every repeat polls every feed: FeedState would otherwise serve repeats 2..N
+    # from memory until FEED_MIN_INTERVAL passes, and feeds are capped per source
+    stages["fetch_all"] = measure(lambda: fetchers.fetch_all(include_questionable=False),
+                                  [()] * repeats, before_each=reset_caches)
+    reset_caches()
+    stages["extract_claims"] = measure(scorer.extract_claims, [(t,) for t in texts], [1] * len(texts))
+    stages["fake_news_scores"] = measure(scorer.fake_news_scores, [(b,) for b in batches], sizes)
+    stages["sensational_scores"] = measure(scorer.sensational_scores, [(b,) for b in batches], sizes)
+
+    claims_list = [scorer.extract_claims(t) for t in texts]
+    evidence_list = scorer.gather_evidence(claims_list)
+    pairs = list(zip(claims_list, evidence_list))
+    pair_batches = _batches(pairs, batch_size)
+    stages["contradiction_scores"] = measure(
+        lambda chunk: scorer.contradiction_scores([c for c, _ in chunk], [e for _, e in chunk]),
+        [(b,) for b in pair_batches], [len(b) for b in pair_batches]
+    )
+
+    reset_caches()
+    post_batches = _batches(corpus, batch_size)
+    stages["compute_risk"] = measure(scorer.compute_risk_batch, [(b,) for b in post_batches],
+                                      [len(b) for b in post_batches])
+    return {
+        "backend": backend,
+        "batch_size": batch_size,
+        "models": {"load_seconds": load_seconds, "peak_rss_mb": round(rss.peak / 1e6, 1)},
+        "stages": stages
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def run(args) -> Dict:
+    corpus = fixture_corpus(args.corpus_size, args.seed)
+    if args.stub_models:
+        install_stub_models(args.stub_cost_ms)
+    backends = ["stub"] if args.stub_models else args.backends
+    original_backends = dict(INFERENCE_BACKENDS)
+
+    runs = []
+    with StubServer(corpus, feeds=args.feeds, latency_ms=args.latency_ms) as stub:
+        point_at_stub(stub)
+        for backend in backends:
+            for batch_size in args.batch_sizes:
+                logger.info(f"Benchmark: backend={backend} batch_size={batch_size}")
+                runs.append(run_config(corpus, backend, batch_size, args.repeats))
+    INFERENCE_BACKENDS.update(original_backends)
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "torch_threads": torch.get_num_threads(),
+            "stub_models": args.stub_models,
+            "corpus_size": args.corpus_size,
+            "seed": args.seed,
+            "feeds": args.feeds,
+            "latency_ms": args.latency_ms,
+            "repeats": args.repeats
+        },
+        "runs": runs
+    }
+
+# === Comparison ===
+
+def compare(baseline: Dict, current: Dict, tolerance: float) -> List[Dict]:
+    """
+    Per (backend, batch size, stage): throughput and p95 change from baseline
+    to current. A stage regresses when items/sec drops or p95 rises by more
+    than `tolerance` (a fraction).
+    """
+    def index(report):
+        return {
+            (r["backend"], r["batch_size"], stage): stats
+            for r in report["runs"] for stage, stats in r["stages"].items()
+        }
+
+    before, after = index(baseline), index(current)
+    rows = []
+    for key in sorted(before.keys() & after.keys(), key=str):
+        b, a = before[key], after[key]
+        throughput = (a["items_per_sec"] / b["items_per_sec"] - 1) if b["items_per_sec"] else 0.0
+        p95 = (a["p95_ms"] / b["p95_ms"] - 1) if b["p95_ms"] else 0.0
+        rows.append({
+            "backend": key[0], "batch_size": key[1], "stage": key[2],
+            "items_per_sec": [b["items_per_sec"], a["items_per_sec"]],
+            "throughput_change": round(throughput, 4),
+            "p95_ms": [b["p95_ms"], a["p95_ms"]],
+            "p95_change": round(p95, 4),
+            "regression": throughput < -tolerance or p95 > tolerance
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fetch and scoring pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="run the benchmark and write JSON results")
+    run_p.add_argument("--stub-models", action="store_true", help="hash-based stand-ins instead of model weights")
+    run_p.add_argument("--stub-cost-ms", type=float, default=0.0, help="simulated inference cost per item")
+    run_p.add_argument("--backends", nargs="+", choices=["torch", "int8", "onnx"], default=["torch"])
+    run_p.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 16])
+    run_p.add_argument("--corpus-size", type=int, default=200)
+    run_p.add_argument("--seed", type=int, default=7)
+    run_p.add_argument("--feeds", type=int, default=8)
+    run_p.add_argument("--latency-ms", type=float, default=0.0, help="stub server delay per response")
+    run_p.add_argument("--repeats", type=int, default=5, help="fetch_all rounds")
+    run_p.add_argument("--output", help="write results here instead of stdout")
+
+    cmp_p = sub.add_parser("compare", help="compare two result files")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.command == "run":
+        report = run(args)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.tolerance)
+    print(json.dumps(rows, indent=2))
+    sys.exit(1 if any(r["regression"] for r in rows) else 0)
+
+if __name__ == "__main__":
+    main()
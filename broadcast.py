@@ -0,0 +1,103 @@
+# broadcast.py - fan-out of server-sent events with a replay buffer for resuming clients
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import AsyncIterator, Optional, Set
+from config import STREAM_BUFFER_SIZE, STREAM_CLIENT_QUEUE, STREAM_HEARTBEAT_SECONDS
+
+logger = logging.getLogger("ViralWarnSystem")
+
+class _Client:
+    __slots__ = ("queue", "overflowed")
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+class Broadcaster:
+    """
+    Publishes events to every connected SSE client. Each event is serialized
+    once into a ready-to-send frame with a sequence id, kept in a ring of the
+    last STREAM_BUFFER_SIZE frames, and pushed onto each client's queue, so N
+    clients cost one serialization per event. A client that reconnects with
+    its last seen id gets the frames it missed from the ring. If it is too
+    far behind for the ring, it gets a "reset" event and reloads the full feed.
+    A client whose queue fills up is disconnected and resumes the same way.
+    Call publish() from the event loop thread.
+    """
+
+    def __init__(self, buffer_size: int = STREAM_BUFFER_SIZE, client_queue: int = STREAM_CLIENT_QUEUE):
+        self.seq = 0
+        self.client_queue = client_queue
+        self._ring: deque = deque(maxlen=buffer_size)  # (seq, frame)
+        self._clients: Set[_Client] = set()
+        self.published = 0
+        self.dropped_clients = 0
+
+    def publish(self, event: str, data) -> int:
+        """Serialize one event and queue it for every client; returns its sequence id."""
+        self.seq += 1
+        frame = f"id: {self.seq}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+        self._ring.append((self.seq, frame))
+        self.published += 1
+        for client in list(self._clients):
+            try:
+                client.queue.put_nowait((self.seq, frame))
+            except asyncio.QueueFull:
+                # Too slow to keep up: close it, it resumes from the ring on reconnect
+                self._clients.discard(client)
+                client.overflowed = True
+                self.dropped_clients += 1
+                logger.info("SSE client fell behind, disconnecting it")
+        return self.seq
+
+    def _replay(self, cursor: int) -> Optional[list]:
+        """Frames after `cursor`, or None when the ring no longer reaches back that far."""
+        if cursor == self.seq:
+            return []
+        if cursor > self.seq:  # id from before a server restart
+            return None
+        if not self._ring or self._ring[0][0] > cursor + 1:
+            return None
+        return [(seq, frame) for seq, frame in self._ring if seq > cursor]
+
+    async def subscribe(self, cursor: Optional[int] = None,
+                        heartbeat: float = STREAM_HEARTBEAT_SECONDS) -> AsyncIterator[bytes]:
+        """
+        Yield SSE frames for one client: missed frames after `cursor` first,
+        then live ones. With no cursor the client starts from now.
+        """
+        client = _Client(self.client_queue)
+        self._clients.add(client)
+        try:
+            last = self.seq if cursor is None else cursor
+            backlog = self._replay(last)
+            if backlog is None:
+                last = self.seq
+                yield f"id: {last}\nevent: reset\ndata: {{}}\n\n".encode()
+                backlog = []
+            for seq, frame in backlog:
+                last = seq
+                yield frame
+
+            while not client.overflowed:
+                try:
+                    seq, frame = await asyncio.wait_for(client.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if seq > last:  # already sent during replay
+                    last = seq
+                    yield frame
+        finally:
+            self._clients.discard(client)
+
+    def stats(self) -> dict:
+        return {
+            "seq": self.seq,
+            "clients": len(self._clients),
+            "buffered": len(self._ring),
+            "published": self.published,
+            "dropped_clients": self.dropped_clients
+        }
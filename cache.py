@@ -0,0 +1,157 @@
+# cache.py - bounded TTL/LRU cache with an optional on-disk SQLite tier
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional
+from config import CACHE_BUSY_TIMEOUT
+
+logger = logging.getLogger("ViralWarnSystem")
+
+_MISSING = object()
+
+def content_hash(post: Dict) -> str:
+    """Stable hash of the parts of a post that affect its score (title, text, url)."""
+    h = hashlib.sha1()
+    for field in ("title", "text", "url"):
+        h.update((post.get(field) or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU with per-entry TTL. If `path` is given, entries
+    are also written to a SQLite table so they survive restarts; a memory miss
+    falls through to disk and promotes the entry back into memory.
+    Values must be JSON-serializable when the disk tier is enabled.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600, path: Optional[str] = None,
+                 table: str = "cache", disk_maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.table = table
+        self.disk_maxsize = disk_maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = Lock()
+        self._writes = 0
+        self._db = None
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str):
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # scoring worker processes share these files: WAL lets readers run during a
+            # write, and writers wait for each other instead of failing with "database is locked"
+            self._db = sqlite3.connect(path, timeout=CACHE_BUSY_TIMEOUT, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(f"PRAGMA busy_timeout={int(CACHE_BUSY_TIMEOUT * 1000)}")
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_expires ON {self.table}(expires)")
+            self._db.commit()
+        except Exception as e:
+            logger.warning(f"Cache disk tier disabled ({path}): {e}")
+            self._db = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._data[key]
+
+            value = self._disk_get(key, now)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, expires, value)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        f"INSERT OR REPLACE INTO {self.table} (key, value, expires) VALUES (?, ?, ?)",
+                        (key, json.dumps(value), expires)
+                    )
+                    self._db.commit()
+                    self._writes += 1
+                    if self._writes % 256 == 0:
+                        self._prune_disk()
+                except Exception as e:
+                    logger.warning(f"Cache disk write failed ({self.table}): {e}")
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.table}")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._data),
+                "disk": self._db is not None
+            }
+
+    # --- internals (caller holds the lock) ---
+
+    def _remember(self, key: str, expires: float, value: Any):
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def _disk_get(self, key: str, now: float) -> Any:
+        if self._db is None:
+            return _MISSING
+        try:
+            row = self._db.execute(
+                f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        except Exception as e:
+            logger.debug(f"Cache disk read failed: {e}")
+            return _MISSING
+        if row is None or row[1] <= now:
+            return _MISSING
+        value = json.loads(row[0])
+        self._remember(key, row[1], value)
+        return value
+
+    def _prune_disk(self):
+        self._db.execute(f"DELETE FROM {self.table} WHERE expires <= ?", (time.time(),))
+        self._db.execute(
+            f"DELETE FROM {self.table} WHERE key IN "
+            f"(SELECT key FROM {self.table} ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.disk_maxsize,)
+        )
+        self._db.commit()
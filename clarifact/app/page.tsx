@@ -322,35 +322,89 @@ const Dashboard = () => {
   const [heatmapLoading, setHeatmapLoading] = useState(false);
 
   useEffect(() => {
-    // Attempt real fetch
-    fetch(`${API_URL}/feed`)
-      .then(res => res.json())
-      .then(data => setFeed(data))
-      .catch(() => console.log("Using mock feed"));
+    let stream = null;
+    let closed = false;
+    // the list never grows past what /feed serves
+    let feedLimit = 0;
 
-    // Fetch heatmap data
-    setHeatmapLoading(true);
-    fetch(`${API_URL}/heatmap`)
-      .then(res => res.json())
-      .then(data => {
-        // Convert object to array for display
-        const heatmapArray = Object.entries(data || {}).map(([country, risk]) => ({
-          country,
-          risk: typeof risk === 'number' ? risk : 0
-        })).sort((a, b) => b.risk - a.risk);
-        setHeatmap(heatmapArray);
-        setHeatmapLoading(false);
-      })
-      .catch(() => {
-        console.log("Using mock heatmap");
-        setHeatmap([
-          { country: 'USA', risk: 0.65 },
-          { country: 'India', risk: 0.58 },
-          { country: 'Russia', risk: 0.72 },
-          { country: 'Brazil', risk: 0.42 }
-        ]);
-        setHeatmapLoading(false);
+    const toHeatmapArray = (data) =>
+      // Convert object to array for display
+      Object.entries(data || {}).map(([country, risk]) => ({
+        country,
+        risk: typeof risk === 'number' ? risk : 0
+      })).sort((a, b) => b.risk - a.risk);
+
+    const openStream = (cursor) => {
+      if (closed || typeof EventSource === 'undefined') return;
+      // EventSource resends the last event id on reconnect, so nothing is missed
+      stream = new EventSource(`${API_URL}/stream?cursor=${cursor}`);
+      stream.addEventListener('item', (e) => {
+        const item = JSON.parse(e.data);
+        setFeed(prev => [item, ...prev.filter(i => i.id !== item.id)]
+          .sort((a, b) => b.risk_score - a.risk_score)
+          .slice(0, feedLimit || undefined));
+      });
+      // Items that dropped out of the server snapshot
+      stream.addEventListener('removed', (e) => {
+        const removed = new Set(JSON.parse(e.data).removed);
+        setFeed(prev => prev.filter(i => !removed.has(i.id)));
+      });
+      stream.addEventListener('heatmap', (e) => {
+        const delta = JSON.parse(e.data);
+        setHeatmap(prev => {
+          const merged = Object.fromEntries((prev || []).map(({ country, risk }) => [country, risk]));
+          Object.entries(delta).forEach(([country, risk]) => {
+            if (risk === null) delete merged[country];
+            else merged[country] = risk;
+          });
+          return toHeatmapArray(merged);
+        });
       });
+      // Too far behind to resume: reload everything
+      stream.addEventListener('reset', () => {
+        stream.close();
+        load();
+      });
+    };
+
+    const load = () => {
+      // Attempt real fetch
+      fetch(`${API_URL}/feed`)
+        .then(res => {
+          const cursor = res.headers.get('X-Stream-Cursor') || '0';
+          return res.json().then(data => {
+            feedLimit = data.length;
+            setFeed(data);
+            openStream(cursor);
+          });
+        })
+        .catch(() => console.log("Using mock feed"));
+
+      // Fetch heatmap data
+      setHeatmapLoading(true);
+      fetch(`${API_URL}/heatmap`)
+        .then(res => res.json())
+        .then(data => {
+          setHeatmap(toHeatmapArray(data));
+          setHeatmapLoading(false);
+        })
+        .catch(() => {
+          console.log("Using mock heatmap");
+          setHeatmap([
+            { country: 'USA', risk: 0.65 },
+            { country: 'India', risk: 0.58 },
+            { country: 'Russia', risk: 0.72 },
+            { country: 'Brazil', risk: 0.42 }
+          ]);
+          setHeatmapLoading(false);
+        });
+    };
+
+    load();
+    return () => {
+      closed = true;
+      if (stream) stream.close();
+    };
   }, []);
 
   const getRiskColor = (risk) => {
@@ -0,0 +1,237 @@
+# clustering.py - near-duplicate story clustering (MinHash + LSH) ahead of scoring
+import hashlib
+import re
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from threading import Lock
+from typing import Dict, List, Optional, Set, Tuple
+from config import (
+    CLUSTER_SHINGLE_SIZE, CLUSTER_NUM_PERM, CLUSTER_BANDS, CLUSTER_THRESHOLD,
+    STORY_INDEX_WINDOW, STORY_INDEX_SIZE
+)
+from dedup import canonicalize_url
+from scorer import with_source_credibility
+from workers import score_batch
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def shingles(text: str, k: int = CLUSTER_SHINGLE_SIZE) -> set:
+    """Word k-gram shingles of lowercased, punctuation-free text."""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+class MinHasher:
+    """Fixed-seed MinHash signatures, stable across processes and restarts."""
+
+    def __init__(self, num_perm: int = CLUSTER_NUM_PERM, seed: int = 1):
+        coeffs = []
+        for i in range(num_perm):
+            digest = hashlib.sha1(f"{seed}:{i}".encode()).digest()
+            a = int.from_bytes(digest[:8], "big") % _MERSENNE_PRIME or 1
+            b = int.from_bytes(digest[8:16], "big") % _MERSENNE_PRIME
+            coeffs.append((a, b))
+        self.coeffs = coeffs
+
+    def signature(self, shingle_set: set) -> List[int]:
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingle_set]
+        if not hashes:
+            return [_MAX_HASH] * len(self.coeffs)
+        return [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self.coeffs
+        ]
+
+def estimated_jaccard(sig_a: List[int], sig_b: List[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+_hasher = MinHasher()
+
+def band_keys(signature: List[int]) -> List[tuple]:
+    """LSH bucket keys of a signature, one per band."""
+    rows = CLUSTER_NUM_PERM // CLUSTER_BANDS
+    return [(band, tuple(signature[band * rows:(band + 1) * rows])) for band in range(CLUSTER_BANDS)]
+
+def item_signatures(items: List[Dict]) -> Tuple[List[List[int]], Set[int]]:
+    """MinHash signature of every item, and the indices of items with no text to compare."""
+    signatures = []
+    empty = set()
+    for i, item in enumerate(items):
+        shingle_set = shingles(f"{item.get('title', '')} {item.get('text', '')}")
+        if not shingle_set:
+            empty.add(i)
+        signatures.append(_hasher.signature(shingle_set))
+    return signatures, empty
+
+def cluster_items(items: List[Dict], threshold: float = CLUSTER_THRESHOLD,
+                  signatures: Optional[Tuple[List[List[int]], Set[int]]] = None) -> List[List[int]]:
+    """
+    Group near-duplicate items (same story from different sources/URLs).
+    Candidate pairs come from LSH band collisions and are kept when their
+    estimated Jaccard similarity reaches `threshold`. Returns clusters as lists
+    of item indices; the first index of each cluster is its representative
+    (the member with the most text). `signatures` is item_signatures(items),
+    if the caller already has it.
+    """
+    signatures, empty = signatures or item_signatures(items)
+
+    parent = list(range(len(items)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    buckets = defaultdict(list)
+    for i, sig in enumerate(signatures):
+        if i in empty:
+            continue
+        for key in band_keys(sig):
+            buckets[key].append(i)
+
+    for members in buckets.values():
+        for x, i in enumerate(members):
+            for j in members[x + 1:]:
+                ri, rj = find(i), find(j)
+                if ri != rj and estimated_jaccard(signatures[i], signatures[j]) >= threshold:
+                    parent[rj] = ri
+
+    groups = defaultdict(list)
+    for i in range(len(items)):
+        groups[find(i)].append(i)
+
+    clusters = []
+    for members in groups.values():
+        members.sort(key=lambda i: -len(items[i].get('text', '') or ''))
+        clusters.append(members)
+    return clusters
+
+def story_id(item: Dict) -> str:
+    """Stable id of a story, derived from its first-seen member (not the representative,
+    which changes whenever a longer variant joins)."""
+    key = canonicalize_url(item.get('url', '')) or item.get('title', '')
+    return "story-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+class StoryIndex:
+    """
+    Stories seen in earlier batches and cycles, so near-duplicates that
+    arrive apart (different feeds, different micro-batches) still join the
+    same story: LSH buckets over member signatures, plus the story's model
+    result. Stories expire `window` seconds after their last new member;
+    beyond `maxsize` the least recently joined are dropped.
+    """
+
+    _MAX_SIGNATURES = 8  # member signatures kept per story to match new variants against
+
+    def __init__(self, window: float = STORY_INDEX_WINDOW, maxsize: int = STORY_INDEX_SIZE,
+                 threshold: float = CLUSTER_THRESHOLD):
+        self.window = window
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._stories: "OrderedDict[str, Dict]" = OrderedDict()  # least recently joined first
+        self._buckets: Dict[tuple, Set[str]] = defaultdict(set)
+        self._lock = Lock()
+
+    def match(self, signature: List[int]) -> Optional[Tuple[str, Optional[Dict]]]:
+        """(story id, its result) of the most similar open story, or None."""
+        with self._lock:
+            self._expire(time.time())
+            best, best_sim = None, self.threshold
+            candidates = set().union(*(self._buckets.get(key, ()) for key in band_keys(signature)))
+            for sid in candidates:
+                sim = max(estimated_jaccard(signature, sig) for sig in self._stories[sid]["signatures"])
+                if sim >= best_sim:
+                    best, best_sim = sid, sim
+            if best is None:
+                return None
+            return best, self._stories[best]["result"]
+
+    def add(self, sid: str, signatures: List[List[int]], result: Optional[Dict]) -> int:
+        """
+        Record new members (and, if given, the story's result) and return the
+        story size. Degraded results aren't kept, so the next member re-scores.
+        """
+        with self._lock:
+            story = self._stories.pop(sid, None) or {"signatures": [], "result": None, "size": 0}
+            for sig in signatures[:self._MAX_SIGNATURES - len(story["signatures"])]:
+                story["signatures"].append(sig)
+                for key in band_keys(sig):
+                    self._buckets[key].add(sid)
+            if result is not None and not result.get('degraded'):
+                story["result"] = result
+            story["size"] += len(signatures)
+            story["seen"] = time.time()
+            self._stories[sid] = story
+            self._expire(story["seen"])
+            return story["size"]
+
+    def __len__(self) -> int:
+        return len(self._stories)
+
+    def _expire(self, now: float):
+        # caller holds the lock
+        while self._stories:
+            sid, story = next(iter(self._stories.items()))
+            if story["seen"] > now - self.window and len(self._stories) <= self.maxsize:
+                break
+            del self._stories[sid]
+            for sig in story["signatures"]:
+                for key in band_keys(sig):
+                    members = self._buckets.get(key)
+                    if members is not None:
+                        members.discard(sid)
+                        if not members:
+                            del self._buckets[key]
+
+# Shared by every score_clustered call (pipeline batches, cycles) in this process
+story_index = StoryIndex()
+
+def score_clustered(items: List[Dict], index: Optional[StoryIndex] = None) -> List[Dict]:
+    """
+    Score each near-duplicate story once (workers.score_batch). Items are
+    clustered within the batch and then matched against `index` (the shared
+    story_index by default), so a variant of a story seen in an earlier
+    batch or cycle joins that story and reuses its result instead of being
+    scored again; only new stories are scored. Members inherit the story's
+    result, re-weighted with their own source credibility. Every result
+    carries `story_id` (from the story's first-seen member) and `story_size`.
+    Returns one result per item, in input order.
+    """
+    if not items:
+        return []
+    index = story_index if index is None else index
+
+    signatures, empty = item_signatures(items)
+    clusters = cluster_items(items, signatures=(signatures, empty))
+
+    # known story: (id, stored result or None when it has to be scored again)
+    known = []
+    for members in clusters:
+        match = None
+        if members[0] not in empty:
+            for idx in members:
+                match = index.match(signatures[idx])
+                if match:
+                    break
+        known.append(match)
+
+    to_score = [i for i, match in enumerate(known) if match is None or match[1] is None]
+    scored = dict(zip(to_score, score_batch([items[clusters[i][0]] for i in to_score])))
+
+    results = [None] * len(items)
+    for i, members in enumerate(clusters):
+        fresh = scored.get(i)
+        base = fresh if fresh is not None else known[i][1]
+        sid = known[i][0] if known[i] else story_id(items[min(members)])
+        if members[0] in empty:
+            size = len(members)  # nothing to match later variants against
+        else:
+            size = index.add(sid, [signatures[idx] for idx in members], fresh)
+        for idx in members:
+            res = base if (fresh is not None and idx == members[0]) else with_source_credibility(base, items[idx].get('url', ''))
+            results[idx] = {**res, 'story_id': sid, 'story_size': size}
+    return results
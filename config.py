@@ -1,10 +1,95 @@
 # config.py - tweak these for demo speed / thresholds
 
 FETCH_INTERVAL_SECONDS = 60           # how often to poll sources
+FEED_FETCH_WORKERS = 8               # feeds downloaded concurrently per cycle
+FEED_CONNECT_TIMEOUT = 3             # seconds to connect to a feed host
+FEED_READ_TIMEOUT = 10               # seconds to wait for feed data
+FEED_CYCLE_DEADLINE = 20             # seconds per fetch cycle; feeds still running are skipped
+FEED_MIN_INTERVAL = FETCH_INTERVAL_SECONDS  # poll interval of a feed that just changed
+FEED_MAX_INTERVAL = 30 * 60          # ceiling for unchanged / failing feeds
+FEED_BACKOFF_FACTOR = 2              # interval multiplier per unchanged poll or failure
+SEEN_INDEX_SIZE = 50000              # stored entries remembered to skip them in later cycles
+SEEN_INDEX_WINDOW = 7 * 24 * 3600    # seconds an entry counts as already seen
+SEEN_INDEX_PATH = ".cache/seen.sqlite"  # set to None to forget seen entries on restart
+CLUSTER_SHINGLE_SIZE = 3             # words per shingle for near-duplicate detection
+CLUSTER_NUM_PERM = 64                # MinHash permutations per item
+CLUSTER_BANDS = 16                   # LSH bands (CLUSTER_NUM_PERM must divide evenly)
+CLUSTER_THRESHOLD = 0.5              # estimated Jaccard similarity to count as the same story
+STORY_INDEX_WINDOW = 6 * 3600        # seconds a story stays open for near-duplicates from later batches / cycles
+STORY_INDEX_SIZE = 20000             # open stories remembered at most (least recently joined dropped first)
 RISK_THRESHOLD = 0.45                # 0..1 threshold to flag alerts
+# weight of each risk component (risk_kernel); missing components are left out and the rest renormalized
+RISK_WEIGHTS = {"fake_news": 0.35, "sensational": 0.25, "contradiction": 0.20, "source": 0.15, "virality": 0.05}
+# per-component calibration curves as (x points, y points) for np.interp; unlisted components pass through.
+# "source" is credibility (1 = trusted), so its curve turns it into risk.
+RISK_CALIBRATION = {"source": ([0.0, 1.0], [1.0, 0.0])}
 WIKIPEDIA_TIMEOUT = 3                # seconds for quick evidence fetch
-MAX_EVENTS_STORED = 200
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+EVIDENCE_WORKERS = 16                # concurrent Wikipedia lookups (and pooled keep-alive connections)
+EVIDENCE_DEADLINE_SECONDS = 5        # overall evidence budget per post; late lookups count as no evidence
+EVIDENCE_CACHE_SIZE = 4096           # in-memory LRU entries for Wikipedia lookups
+EVIDENCE_CACHE_TTL = 6 * 3600        # seconds a cached evidence hit stays valid
+EVIDENCE_CACHE_NEGATIVE_TTL = 1800   # seconds an empty search result stays cached
+EVIDENCE_CACHE_PATH = ".cache/evidence.sqlite"  # set to None for a memory-only cache
+GEO_CACHE_PATH = ".cache/geo.sqlite"  # domain -> country lookups; set to None for a memory-only cache
+GEO_CACHE_SIZE = 10000               # in-memory domain -> country entries
+GEO_CACHE_TTL = 30 * 24 * 3600       # seconds a resolved domain's country is reused
+GEO_NEGATIVE_TTL = 24 * 3600         # seconds an unresolvable domain is not looked up again
+GEO_LOOKUP_TIMEOUT = 2               # seconds per DNS / ipapi.co step of a network geolocation lookup
+GEO_MAX_CONCURRENT_LOOKUPS = 4       # network geolocation lookups in flight at once
+GEOIP_DB_PATH = None                 # optional local GeoLite2-Country.mmdb (needs the geoip2 package)
+SCORE_CACHE_SIZE = 5000              # in-memory entries of the per-item scoring result cache
+SCORE_CACHE_TTL = 24 * 3600          # seconds a scored item is reused before being re-scored
+SCORE_CACHE_PATH = ".cache/scores.sqlite"  # set to None for a memory-only cache
+SCORE_CACHE_DEGRADED_TTL = 300       # seconds a result with a fallback component (model or lookup failed) is reused
+CACHE_BUSY_TIMEOUT = 5               # seconds a cache write waits for another process holding the SQLite lock
+MAX_EVENTS_STORED = 200              # recent events kept in memory as the store's read cache
+AGG_BUCKET_SECONDS = 300             # width of recent risk aggregation buckets (location x topic)
+AGG_FINE_RETENTION = 2 * 3600        # fine buckets older than this are compacted; >= largest sub-day window + one coarse width
+AGG_COARSE_BUCKET_SECONDS = 3600     # width of compacted buckets
+AGG_RETENTION = 24 * 3600            # aggregates older than this are dropped
+AGG_WINDOWS = {"15m": 15 * 60, "1h": 3600, "24h": 24 * 3600}  # named sliding windows
+HEATMAP_WINDOW = "1h"                # default window of /heatmap
+AGG_RESTORE_LIMIT = 20000            # stored events replayed into the aggregates on start
+STORE_BACKEND = "sqlite"             # durable event store: "sqlite" or "memory" (lost on restart)
+STORE_PATH = ".cache/events.sqlite"  # SQLite database of the "sqlite" store backend
+STORE_BATCH_SIZE = 100               # buffered events that trigger a store commit...
+STORE_FLUSH_SECONDS = 1.0            # ...otherwise buffered writes are committed this often
+STORE_MAX_EVENTS = 100000            # events kept on disk, oldest deleted first (0 = unlimited)
 USE_HEAVY_MODELS = True              # set False to use fast stubs (demo friendly)
+MODEL_DEVICE = "auto"                # "auto", "cpu", "cuda" or "cuda:N" for all torch models
+TORCH_NUM_THREADS = 0                # torch intra-op threads per process (0 = torch default)
+MODEL_MEMORY_BUDGET_MB = 0           # evict least-recently-used models beyond this (0 = no limit)
+# per-model inference backend: "torch" (fp32), "int8" (dynamic quantization, CPU) or "onnx" (ONNX Runtime, CPU)
+INFERENCE_BACKENDS = {"fake_news": "torch", "sentiment": "torch", "nli": "torch"}
+ONNX_CACHE_DIR = ".cache/onnx"       # exported ONNX graphs (python inference_backends.py export)
+SCORING_BATCH_SIZE = 16              # mini-batch size for model inference in compute_risk_batch
+SPACY_BATCH_SIZE = 64                # docs per nlp.pipe batch
+SPACY_N_PROCESS = 1                  # nlp.pipe worker processes (>1 forks spaCy workers)
+ANALYSIS_CACHE_SIZE = 2048           # parsed documents kept in memory, keyed by content hash
+ANALYSIS_MAX_CHARS = 1000            # chars of each document that get parsed
+MICROBATCH_MAX_SIZE = 32             # API inference: flush a batch at this many queued texts...
+MICROBATCH_MAX_WAIT_MS = 10          # ...or once the oldest text has waited this long
+MICROBATCH_MAX_QUEUE = 256           # texts waiting per batcher before requests get 429
+IO_WORKERS = 8                       # API threads for blocking network / feed I/O
+IO_MAX_PENDING = 64                  # queued + running I/O jobs before requests get 429
+INFERENCE_WORKERS = 2                # API threads for model inference and spaCy
+INFERENCE_MAX_PENDING = 16           # queued + running inference jobs before requests get 429
+REQUEST_TIMEOUT_SECONDS = 30         # per-request deadline for /analyze (504 when exceeded)
+FEED_REFRESH_TIMEOUT_SECONDS = 120   # deadline for a feed fetch + score refresh
+FEED_REFRESH_SECONDS = 300           # backend_server: background refresh period of the /feed snapshot
+STREAM_BUFFER_SIZE = 1000            # recent /stream events kept for clients resuming with Last-Event-ID
+STREAM_CLIENT_QUEUE = 500            # undelivered events per /stream client before it is disconnected
+STREAM_HEARTBEAT_SECONDS = 15        # keep-alive comment interval on idle /stream connections
+SCORING_WORKERS = 0                  # scoring processes for compute_risk (0 = score in the calling process)
+WORKER_TORCH_THREADS = 0             # torch threads per scoring process (0 = cores / SCORING_WORKERS)
+SCORING_CHUNK_SIZE = 16              # posts handed to a scoring process at a time
+PIPELINE_QUEUE_SIZE = 64             # items buffered between background pipeline stages (backpressure)
+PIPELINE_CLEAN_WORKERS = 1           # threads in the clean stage
+PIPELINE_SCORE_WORKERS = 1           # threads in the score stage (each may use the SCORING_WORKERS pool)
+PIPELINE_SCORE_BATCH = 8             # items scored together once available...
+PIPELINE_BATCH_WAIT_MS = 200         # ...or after waiting this long for the batch to fill
+NLI_MODE = "cross_encoder"           # "cross_encoder" (batched premise/hypothesis) or "zero_shot" pipeline
 REDDIT_RSS_FEEDS = [
     "https://www.reddit.com/r/news/.rss",
     "https://www.reddit.com/r/worldnews/.rss",
@@ -0,0 +1,83 @@
+# dedup.py - cross-cycle entry dedup: URL canonicalization and a bounded "seen" index
+import hashlib
+from typing import Dict, List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from cache import TTLCache
+from config import SEEN_INDEX_SIZE, SEEN_INDEX_WINDOW, SEEN_INDEX_PATH
+
+# Query parameters that only identify the referrer / campaign, never the article
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "referrer", "cmpid", "ocid", "s_cid", "smid",
+    "at_medium", "at_campaign", "ito", "ns_mchannel", "ns_source",
+    "ns_campaign", "ns_linkname", "ns_fee", "taid"
+}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so the same article matches across feeds and polls:
+    https scheme, lowercase host without www./default port, no fragment,
+    no tracking params (utm_* and friends), sorted query, no trailing slash.
+    """
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+def _digest(kind: str, value: str) -> str:
+    # 16 hex chars (64 bits) keeps entries compact; collisions are negligible at this size
+    return kind + ":" + hashlib.sha1(value.encode("utf-8")).hexdigest()[:16]
+
+class SeenIndex:
+    """
+    Time-windowed, size-bounded record of entries already returned, keyed by
+    canonical URL and by feed GUID. Entries expire after `window` seconds, the
+    oldest are evicted beyond `maxsize`, and the index survives restarts when
+    given a SQLite path.
+    """
+
+    def __init__(self, maxsize: int = SEEN_INDEX_SIZE, window: float = SEEN_INDEX_WINDOW,
+                 path: str = SEEN_INDEX_PATH):
+        self._cache = TTLCache(maxsize=maxsize, ttl=window, path=path, table="seen", disk_maxsize=maxsize)
+
+    def _keys(self, item: Dict) -> List[str]:
+        keys = []
+        url = canonicalize_url(item.get('url', ''))
+        if url:
+            keys.append(_digest("u", url))
+        if item.get('guid'):
+            keys.append(_digest("g", item['guid']))
+        if not keys and item.get('id'):
+            keys.append(_digest("i", item['id']))
+        return keys
+
+    def seen(self, item: Dict) -> bool:
+        return any(key in self._cache for key in self._keys(item))
+
+    def mark(self, items: List[Dict]):
+        """Record items as seen; call once they are stored, so a failed cycle doesn't lose them."""
+        for item in items:
+            for key in self._keys(item):
+                self._cache.set(key, 1)
+
+    def filter_new(self, items: List[Dict]) -> List[Dict]:
+        """Return the items not seen before (read-only; see mark)."""
+        return [item for item in items if not self.seen(item)]
+
+    def stats(self) -> Dict:
+        return self._cache.stats()
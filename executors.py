@@ -0,0 +1,56 @@
+# executors.py - bounded executors that keep blocking work off the asyncio event loop
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore
+from fastapi import HTTPException
+from config import (
+    IO_WORKERS, IO_MAX_PENDING, INFERENCE_WORKERS, INFERENCE_MAX_PENDING, REQUEST_TIMEOUT_SECONDS
+)
+
+class QueueFullError(RuntimeError):
+    """Raised instead of queueing when an executor or batcher is at capacity."""
+
+class BoundedExecutor(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor that refuses work (QueueFullError) once `max_pending`
+    jobs are queued or running, instead of growing an unbounded backlog.
+    Usable anywhere an Executor is, including loop.run_in_executor.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, name: str):
+        super().__init__(max_workers=max_workers, thread_name_prefix=name)
+        self.name = name
+        self.max_pending = max_pending
+        self._slots = BoundedSemaphore(max_pending)
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError(f"{self.name} executor is full ({self.max_pending} pending)")
+        try:
+            future = super().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, fn, *args, timeout: float = None):
+        """Run fn(*args) on this executor and await it, optionally with a timeout."""
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(fn, *args)), timeout)
+
+# Blocking network / feed I/O
+io_executor = BoundedExecutor(IO_WORKERS, IO_MAX_PENDING, "io")
+# Model inference and spaCy parsing (CPU bound, so few threads)
+inference_executor = BoundedExecutor(INFERENCE_WORKERS, INFERENCE_MAX_PENDING, "inference")
+
+async def guarded(awaitable, timeout: float = REQUEST_TIMEOUT_SECONDS):
+    """
+    Await request work under a deadline. Overload becomes 429 (retry later),
+    an expired deadline becomes 504.
+    """
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=f"Server busy, retry later ({e})")
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Request exceeded {timeout}s")
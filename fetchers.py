@@ -3,10 +3,18 @@ import feedparser
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
-from typing import List, Dict
+from typing import Callable, Iterator, List, Dict, Tuple
 import logging
 import os
-from config import REDDIT_RSS_FEEDS, GOOGLE_NEWS_RSS, NITTER_SEARCH_URL
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from threading import Lock
+from config import (
+    REDDIT_RSS_FEEDS, GOOGLE_NEWS_RSS, NITTER_SEARCH_URL,
+    FEED_FETCH_WORKERS, FEED_CONNECT_TIMEOUT, FEED_READ_TIMEOUT, FEED_CYCLE_DEADLINE,
+    FEED_MIN_INTERVAL, FEED_MAX_INTERVAL, FEED_BACKOFF_FACTOR
+)
+from dedup import SeenIndex, canonicalize_url
 
 logger = logging.getLogger("ViralWarnSystem")
 
@@ -45,6 +53,66 @@ INDIA_NEWS_FEEDS = [
     {"name": "Scroll.in", "url": "https://scroll.in/feed"},
 ]
 
+_fetch_pool = ThreadPoolExecutor(max_workers=FEED_FETCH_WORKERS, thread_name_prefix="feeds")
+
+# Outcome of the most recent concurrent fetch (duration, skipped feeds, ...)
+last_fetch_report: Dict = {}
+
+# Entries already stored by an earlier poll cycle (callers mark them after storing)
+seen_index = SeenIndex()
+
+class FeedState:
+    """HTTP validators, last parsed items and adaptive poll schedule of one feed."""
+
+    def __init__(self):
+        self.etag = None
+        self.modified = None
+        self.items: List[Dict] = []
+        self.interval = FEED_MIN_INTERVAL
+        self.next_poll = 0.0
+        self.failures = 0
+
+    def due(self) -> bool:
+        return time.time() >= self.next_poll
+
+    def changed(self):
+        self.failures = 0
+        self.interval = FEED_MIN_INTERVAL
+        self.next_poll = time.time() + self.interval
+
+    def unchanged(self):
+        self.failures = 0
+        self.interval = min(FEED_MAX_INTERVAL, self.interval * FEED_BACKOFF_FACTOR)
+        self.next_poll = time.time() + self.interval
+
+    def failed(self):
+        self.failures += 1
+        self.interval = min(FEED_MAX_INTERVAL, FEED_MIN_INTERVAL * FEED_BACKOFF_FACTOR ** self.failures)
+        self.next_poll = time.time() + self.interval
+
+_feed_states: Dict[str, FeedState] = {}
+_feed_states_lock = Lock()
+
+def _feed_state(feed_url: str) -> FeedState:
+    with _feed_states_lock:
+        if feed_url not in _feed_states:
+            _feed_states[feed_url] = FeedState()
+        return _feed_states[feed_url]
+
+def feed_poll_status() -> Dict[str, Dict]:
+    """Current poll interval, failure count and seconds until next poll per feed URL."""
+    now = time.time()
+    with _feed_states_lock:
+        return {
+            url: {
+                "interval": state.interval,
+                "failures": state.failures,
+                "next_poll_in": max(0, round(state.next_poll - now)),
+                "cached_items": len(state.items)
+            }
+            for url, state in _feed_states.items()
+        }
+
 def parse_feed_entry(e, source_name: str = "Unknown") -> Dict:
     """Parse a single RSS feed entry into our standard format."""
     title = e.get('title', '')
@@ -59,6 +127,7 @@ def parse_feed_entry(e, source_name: str = "Unknown") -> Dict:
     
     return {
         'id': link or title,
+        'guid': e.get('id', ''),
         'title': title,
         'text': summary[:500],  # Limit to 500 chars
         'url': link,
@@ -68,17 +137,46 @@ def parse_feed_entry(e, source_name: str = "Unknown") -> Dict:
     }
 
 def fetch_rss_feed(feed_url: str, source_name: str, limit: int = 15) -> List[Dict]:
-    """Fetch items from a single RSS feed."""
+    """
+    Fetch items from a single RSS feed.
+    Sends If-None-Match / If-Modified-Since from the previous poll; on a 304,
+    while the feed is backing off, or when it fails, the last parsed items
+    are returned without parsing anything.
+    """
+    state = _feed_state(feed_url)
+    if not state.due():
+        logger.debug(f"Skipping {source_name}, next poll in {state.next_poll - time.time():.0f}s")
+        return state.items[:limit]
+    
     items = []
     try:
         logger.info(f"Fetching from {source_name} ({feed_url})")
-        d = feedparser.parse(feed_url)
+        headers = {"User-Agent": "Clarifact-AI/2.0 (+rss poller)"}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.modified:
+            headers["If-Modified-Since"] = state.modified
+        
+        # feedparser has no timeout of its own, so download first and parse the body
+        response = requests.get(
+            feed_url,
+            timeout=(FEED_CONNECT_TIMEOUT, FEED_READ_TIMEOUT),
+            headers=headers
+        )
+        if response.status_code == 304:
+            state.unchanged()
+            logger.info(f"{source_name} not modified, next poll in {state.interval}s")
+            return state.items[:limit]
+        
+        response.raise_for_status()
+        d = feedparser.parse(response.content)
         
         if d.bozo:  # Feed parsing had issues but may still have data
             logger.warning(f"Feed parsing issues for {source_name}: {d.bozo_exception}")
         
         if not d.entries:
             logger.warning(f"No entries found in {source_name}")
+            state.failed()
             return items
         
         for e in d.entries[:limit]:
@@ -90,43 +188,82 @@ def fetch_rss_feed(feed_url: str, source_name: str, limit: int = 15) -> List[Dic
                 logger.debug(f"Error parsing entry from {source_name}: {entry_err}")
                 continue
         
+        if not items:
+            logger.warning(f"No usable entries in {source_name}")
+            state.failed()
+            return items
+        
+        # Servers without validators: treat identical content as unchanged too
+        if [i['url'] for i in items] == [i['url'] for i in state.items]:
+            state.unchanged()
+        else:
+            state.changed()
+        # Validators only go with a parsed body, else a 304 would pin an empty feed
+        state.etag = response.headers.get("ETag")
+        state.modified = response.headers.get("Last-Modified")
+        state.items = items
+        
         logger.info(f"Successfully fetched {len(items)} items from {source_name}")
     except Exception as e:
-        logger.error(f"Error fetching {source_name}: {e}")
+        state.failed()
+        logger.error(f"Error fetching {source_name}: {e} (retry in {state.interval}s)")
+        # Serve the last good items while the feed is failing
+        items = state.items[:limit]
     
     return items
 
-def fetch_reputed_news(limit: int = 20) -> List[Dict]:
-    """Fetch from reputed news sources."""
+def run_fetch_jobs(jobs: List[Tuple[str, Callable, tuple]], deadline: float = FEED_CYCLE_DEADLINE) -> List[Dict]:
+    """
+    Run (name, fetch_fn, args) jobs concurrently on the shared fetch pool.
+    Jobs still running after `deadline` seconds are skipped and reported in
+    `last_fetch_report`; results keep the job order.
+    """
+    started = time.monotonic()
+    futures = [(name, _fetch_pool.submit(fn, *args)) for name, fn, args in jobs]
+    done, pending = wait([f for _, f in futures], timeout=deadline)
+    
     items = []
-    for feed_info in REPUTED_RSS_FEEDS:
-        feed_items = fetch_rss_feed(feed_info["url"], feed_info["name"], limit=limit)
-        items.extend(feed_items)
+    skipped = []
+    for name, fut in futures:
+        if fut in done:
+            try:
+                items.extend(fut.result())
+            except Exception as e:
+                logger.error(f"Error fetching {name}: {e}")
+        else:
+            fut.cancel()
+            skipped.append(name)
+    
+    if skipped:
+        logger.warning(f"Fetch deadline ({deadline}s) hit, skipped: {', '.join(skipped)}")
+    
+    last_fetch_report.clear()
+    last_fetch_report.update({
+        "feeds": len(jobs),
+        "skipped": skipped,
+        "items": len(items),
+        "duration": round(time.monotonic() - started, 2)
+    })
     return items
 
+def _feed_jobs(feeds: List[Dict], limit: int) -> List[Tuple[str, Callable, tuple]]:
+    return [(f["name"], fetch_rss_feed, (f["url"], f["name"], limit)) for f in feeds]
+
+def fetch_reputed_news(limit: int = 20) -> List[Dict]:
+    """Fetch from reputed news sources."""
+    return run_fetch_jobs(_feed_jobs(REPUTED_RSS_FEEDS, limit))
+
 def fetch_questionable_news(limit: int = 20) -> List[Dict]:
     """Fetch from questionable/sensational news sources (for comparison)."""
-    items = []
-    for feed_info in QUESTIONABLE_RSS_FEEDS:
-        feed_items = fetch_rss_feed(feed_info["url"], feed_info["name"], limit=limit)
-        items.extend(feed_items)
-    return items
+    return run_fetch_jobs(_feed_jobs(QUESTIONABLE_RSS_FEEDS, limit))
 
 def fetch_entertainment_news(limit: int = 15) -> List[Dict]:
     """Fetch entertainment and trending content."""
-    items = []
-    for feed_info in ENTERTAINMENT_FEEDS:
-        feed_items = fetch_rss_feed(feed_info["url"], feed_info["name"], limit=limit)
-        items.extend(feed_items)
-    return items
+    return run_fetch_jobs(_feed_jobs(ENTERTAINMENT_FEEDS, limit))
 
 def fetch_india_news(limit: int = 20) -> List[Dict]:
     """Fetch India-specific news from reputed Indian sources."""
-    items = []
-    for feed_info in INDIA_NEWS_FEEDS:
-        feed_items = fetch_rss_feed(feed_info["url"], feed_info["name"], limit=limit)
-        items.extend(feed_items)
-    return items
+    return run_fetch_jobs(_feed_jobs(INDIA_NEWS_FEEDS, limit))
 
 def fetch_via_newsapi(api_key: str = None, limit: int = 20) -> List[Dict]:
     """Fetch news via NewsAPI (requires API key)."""
@@ -171,31 +308,90 @@ def fetch_via_newsapi(api_key: str = None, limit: int = 20) -> List[Dict]:
     
     return items
 
-def fetch_all(include_questionable: bool = True) -> List[Dict]:
-    """Fetch from all sources and deduplicate."""
-    results = []
-    
-    # Fetch from all sources
-    results.extend(fetch_reputed_news(limit=12))
-    results.extend(fetch_entertainment_news(limit=10))
-    results.extend(fetch_india_news(limit=15))  # India-specific news
+def _all_jobs(include_questionable: bool = True) -> List[Tuple[str, Callable, tuple]]:
+    jobs = (
+        _feed_jobs(REPUTED_RSS_FEEDS, 12) +
+        _feed_jobs(ENTERTAINMENT_FEEDS, 10) +
+        _feed_jobs(INDIA_NEWS_FEEDS, 15)  # India-specific news
+    )
     
     if include_questionable:
-        results.extend(fetch_questionable_news(limit=10))
+        jobs += _feed_jobs(QUESTIONABLE_RSS_FEEDS, 10)
     
     # Try NewsAPI if available
-    results.extend(fetch_via_newsapi(limit=15))
+    jobs.append(("NewsAPI", fetch_via_newsapi, (None, 15)))
+    return jobs
+
+def iter_all(include_questionable: bool = True, deadline: float = FEED_CYCLE_DEADLINE) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Streaming fetch_all: yield (source name, items) as soon as each source
+    finishes, fastest first, without dedup. Sources still running at the
+    deadline are skipped and reported in `last_fetch_report`.
+    The deadline only bounds the fetches: time the consumer spends between
+    items (e.g. blocked on a full pipeline queue) never turns a source that
+    has already finished into a skipped one.
+    """
+    started = time.monotonic()
+    futures = {_fetch_pool.submit(fn, *args): name for name, fn, args in _all_jobs(include_questionable)}
+    # when each fetch itself finished, independent of when we get to look at it
+    finished_at = {}
+    for fut in futures:
+        fut.add_done_callback(lambda f: finished_at.setdefault(f, time.monotonic()))
+    pending = set(futures)
+    count = 0
+    while pending:
+        remaining = max(0.0, deadline - (time.monotonic() - started))
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        late = {fut for fut in done if finished_at.get(fut, started) - started > deadline}
+        pending |= late
+        done -= late
+        if not done:
+            break  # deadline hit with nothing else finished in time
+        for fut in done:
+            try:
+                items = fut.result()
+            except Exception as e:
+                logger.error(f"Error fetching {futures[fut]}: {e}")
+                continue
+            count += len(items)
+            yield futures[fut], items
     
-    # Deduplicate by URL
+    skipped = [futures[fut] for fut in pending]
+    for fut in pending:
+        fut.cancel()
+    if skipped:
+        logger.warning(f"Fetch deadline ({deadline}s) hit, skipped: {', '.join(skipped)}")
+    
+    last_fetch_report.clear()
+    last_fetch_report.update({
+        "feeds": len(futures),
+        "skipped": skipped,
+        "items": count,
+        "duration": round(time.monotonic() - started, 2)
+    })
+
+def fetch_all(include_questionable: bool = True, only_new: bool = False) -> List[Dict]:
+    """
+    Fetch from all sources concurrently and deduplicate by canonical URL.
+    With only_new=True, entries already recorded in seen_index (same
+    canonical URL or feed GUID) are dropped as well; the caller records the
+    returned entries with seen_index.mark(items) once it has stored them.
+    """
+    # One cycle-level deadline across every source
+    results = run_fetch_jobs(_all_jobs(include_questionable))
+    
+    # Deduplicate by canonical URL
     seen = set()
     uniq = []
     for r in results:
-        if r['url'] and r['url'] not in seen:
+        key = canonicalize_url(r['url']) or r['id']
+        if key not in seen:
             uniq.append(r)
-            seen.add(r['url'])
-        elif not r['url'] and r['id'] not in seen:
-            uniq.append(r)
-            seen.add(r['id'])
+            seen.add(key)
     
     logger.info(f"Total unique items fetched: {len(uniq)}")
+    
+    if only_new:
+        uniq = seen_index.filter_new(uniq)
+        logger.info(f"New since previous cycles: {len(uniq)}")
     return uniq
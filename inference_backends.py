@@ -0,0 +1,162 @@
+# inference_backends.py - fp32 / dynamic-int8 / ONNX Runtime backends for the classifier models
+"""
+Each transformer classifier can run on one of three backends, chosen per
+model in config.INFERENCE_BACKENDS:
+
+    torch  - PyTorch fp32 (default, any device)
+    int8   - PyTorch dynamic quantization of the Linear layers (CPU only)
+    onnx   - exported ONNX Runtime graph via optimum (CPU), cached on disk
+
+Usage:
+    python inference_backends.py export                 # export/cache ONNX graphs
+    python inference_backends.py parity --backend int8  # score drift vs fp32
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, List, Sequence, Tuple, Union
+import torch
+from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+from config import ONNX_CACHE_DIR
+
+logger = logging.getLogger("ViralWarnSystem")
+
+BACKENDS = ("torch", "int8", "onnx")
+
+def _onnx_dir(model_name: str) -> str:
+    return os.path.join(ONNX_CACHE_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name))
+
+def export_onnx(model_name: str):
+    """Export a model to ONNX once and load it from the cache afterwards."""
+    from optimum.onnxruntime import ORTModelForSequenceClassification  # optional dependency
+
+    path = _onnx_dir(model_name)
+    if os.path.isdir(path) and any(f.endswith(".onnx") for f in os.listdir(path)):
+        return ORTModelForSequenceClassification.from_pretrained(path)
+
+    logger.info(f"Exporting {model_name} to ONNX ({path})")
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    model.save_pretrained(path)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(path)
+    return model
+
+def load_sequence_classifier(model_name: str, backend: str = "torch", device: str = "cpu") -> Tuple:
+    """Return (tokenizer, model) for `model_name` on the requested backend."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if backend == "onnx":
+        try:
+            return tokenizer, export_onnx(model_name)
+        except ImportError:
+            logger.warning("optimum[onnxruntime] not installed, falling back to the torch backend")
+            backend = "torch"
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    if backend == "int8":
+        if device != "cpu":
+            logger.warning(f"int8 backend runs on CPU only, ignoring device {device} for {model_name}")
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        model.to(device)
+    return tokenizer, model
+
+def build_pipeline(task: str, model_name: str, backend: str = "torch", device: str = "cpu"):
+    """A transformers pipeline for `task` backed by the requested backend."""
+    if backend == "torch":
+        return pipeline(task, model=model_name, tokenizer=model_name, device=device)
+    tokenizer, model = load_sequence_classifier(model_name, backend, device)
+    # quantized / ONNX models only run on CPU
+    return pipeline(task, model=model, tokenizer=tokenizer, device="cpu")
+
+def class_probabilities(tokenizer, model, inputs: Sequence[Union[str, Tuple[str, str]]],
+                        batch_size: int = 16) -> List[List[float]]:
+    """Softmax class probabilities for single texts or (premise, hypothesis) pairs."""
+    probs = []
+    for start in range(0, len(inputs), batch_size):
+        chunk = inputs[start:start + batch_size]
+        if chunk and isinstance(chunk[0], tuple):
+            first, second = [c[0] for c in chunk], [c[1] for c in chunk]
+            encoded = tokenizer(first, second, padding=True, truncation=True, max_length=512, return_tensors="pt")
+        else:
+            encoded = tokenizer(list(chunk), padding=True, truncation=True, max_length=512, return_tensors="pt")
+        encoded = encoded.to(model.device)
+        with torch.inference_mode():
+            logits = model(**encoded).logits
+        probs.extend(logits.softmax(dim=-1).tolist())
+    return probs
+
+def parity_check(model_name: str, backend: str, inputs: Sequence) -> Dict:
+    """
+    Score `inputs` with fp32 and with `backend`, and report the drift:
+    max/mean absolute probability difference, top-label agreement and timings.
+    """
+    tok_ref, ref = load_sequence_classifier(model_name, "torch", "cpu")
+    tok_alt, alt = load_sequence_classifier(model_name, backend, "cpu")
+
+    started = time.perf_counter()
+    ref_probs = class_probabilities(tok_ref, ref, inputs)
+    ref_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    alt_probs = class_probabilities(tok_alt, alt, inputs)
+    alt_seconds = time.perf_counter() - started
+
+    diffs = [abs(a - b) for pr, pa in zip(ref_probs, alt_probs) for a, b in zip(pr, pa)]
+    agree = sum(
+        1 for pr, pa in zip(ref_probs, alt_probs)
+        if max(range(len(pr)), key=pr.__getitem__) == max(range(len(pa)), key=pa.__getitem__)
+    )
+    return {
+        "model": model_name,
+        "backend": backend,
+        "samples": len(inputs),
+        "max_abs_drift": round(max(diffs), 5) if diffs else 0.0,
+        "mean_abs_drift": round(sum(diffs) / len(diffs), 5) if diffs else 0.0,
+        "label_agreement": round(agree / len(inputs), 4) if inputs else 1.0,
+        "fp32_seconds": round(ref_seconds, 3),
+        "backend_seconds": round(alt_seconds, 3),
+        "speedup": round(ref_seconds / alt_seconds, 2) if alt_seconds else None
+    }
+
+# Small built-in sample for parity checks
+PARITY_TEXTS = [
+    "BREAKING: Miracle cure for aging found in backyard weeds, doctors stunned",
+    "The central bank kept interest rates unchanged on Thursday, citing stable inflation.",
+    "Leaked documents prove the moon landing was staged, insiders claim",
+    "Heavy rain is expected across Kerala this weekend, the weather department said.",
+    "You won't believe what this celebrity said about the election results!",
+    "Parliament passed the budget bill after a three-day debate.",
+]
+PARITY_PAIRS = [
+    ("Paris is the capital of France.", "Paris is the capital of Germany."),
+    ("The vaccine was approved after clinical trials.", "The vaccine was approved."),
+    ("The match ended in a draw.", "India won the match by five wickets."),
+    ("The river flooded several villages in Assam.", "Assam experienced flooding."),
+]
+
+def main():
+    from models import FAKE_NEWS_MODEL, SENTIMENT_MODEL, NLI_MODEL
+
+    models = {"fake_news": FAKE_NEWS_MODEL, "sentiment": SENTIMENT_MODEL, "nli": NLI_MODEL}
+    parser = argparse.ArgumentParser(description="Export and validate CPU inference backends")
+    parser.add_argument("command", choices=["export", "parity"])
+    parser.add_argument("--backend", choices=["int8", "onnx"], default="onnx")
+    parser.add_argument("--models", nargs="+", choices=list(models), default=list(models))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for key in args.models:
+        if args.command == "export":
+            export_onnx(models[key])
+            print(f"{key}: exported to {_onnx_dir(models[key])}")
+        else:
+            inputs = PARITY_PAIRS if key == "nli" else PARITY_TEXTS
+            print(json.dumps(parity_check(models[key], args.backend, inputs)))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
+import gc
 import logging
-from transformers import pipeline
+import os
+import time
+import torch
+from collections import OrderedDict
+from threading import Lock
 from sentence_transformers import SentenceTransformer
 import spacy
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
+from config import MODEL_DEVICE, TORCH_NUM_THREADS, MODEL_MEMORY_BUDGET_MB, INFERENCE_BACKENDS
+from inference_backends import build_pipeline, load_sequence_classifier
 
 logger = logging.getLogger("ViralWarnSystem")
 
@@ -12,111 +19,276 @@ SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment"
 NLI_MODEL = "roberta-large-mnli"
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 SPACY_MODEL = "en_core_web_sm"
+# Only sentences, noun chunks and entities are used; skip the rest of the pipeline
+SPACY_DISABLED_COMPONENTS = ["lemmatizer"]
 
-# === Lazy-loaded globals ===
-_fake_news_clf: Optional[pipeline] = None
-_sentiment_clf: Optional[pipeline] = None
-_nli_clf: Optional[pipeline] = None
-_embed_model: Optional[SentenceTransformer] = None
-_spacy_model: Optional[spacy.Language] = None
+# === Device / thread selection ===
+
+_torch_configured = False
+
+def resolve_device() -> str:
+    """Map MODEL_DEVICE ("auto", "cpu", "cuda", "cuda:N") to a concrete torch device string."""
+    if MODEL_DEVICE == "auto":
+        return "cuda:0" if torch.cuda.is_available() else "cpu"
+    if MODEL_DEVICE.startswith("cuda") and not torch.cuda.is_available():
+        logger.warning(f"MODEL_DEVICE={MODEL_DEVICE} but CUDA is unavailable, using CPU")
+        return "cpu"
+    return "cuda:0" if MODEL_DEVICE == "cuda" else MODEL_DEVICE
+
+def configure_torch_threads(num_threads: int = TORCH_NUM_THREADS):
+    """Apply the intra-op thread count once per process (0 keeps torch's default)."""
+    global _torch_configured
+    if num_threads and not _torch_configured:
+        torch.set_num_threads(num_threads)
+        logger.info(f"torch intra-op threads set to {num_threads}")
+    _torch_configured = True
+
+def _rss_bytes() -> int:
+    """Current resident set size (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def _tensor_sizes(obj: Any) -> Dict[Any, int]:
+    """
+    Bytes of the torch module(s) a loaded object wraps, per distinct storage
+    (keyed by data_ptr), so weights shared between models can be counted
+    once. Dynamically quantized layers keep their int8 weights packed outside
+    parameters(); those are sized from the unpacked weight / bias.
+    """
+    if isinstance(obj, tuple):
+        sizes = {}
+        for part in obj:
+            sizes.update(_tensor_sizes(part))
+        return sizes
+    module = getattr(obj, "model", obj)
+    if not isinstance(module, torch.nn.Module):
+        return {}
+    sizes = {}
+    for t in list(module.parameters()) + list(module.buffers()):
+        sizes[t.data_ptr()] = t.numel() * t.element_size()
+    for m in module.modules():
+        packed = getattr(m, "_packed_params", None)
+        if isinstance(packed, torch.nn.Module) and hasattr(packed, "_weight_bias"):
+            tensors = [t for t in packed._weight_bias() if t is not None]
+            sizes[("packed", id(m))] = sum(t.numel() * t.element_size() for t in tensors)
+    return sizes
+
+# === Model Registry ===
+
+class ModelRegistry:
+    """
+    Lazy, thread-safe model cache. Each model has its own load lock, so
+    concurrent first use loads it exactly once without blocking other models.
+    Tracks resident bytes and load time per model, keeps use order for LRU
+    eviction, and evicts least-recently-used models beyond MODEL_MEMORY_BUDGET_MB.
+    """
+
+    def __init__(self, memory_budget_mb: int = MODEL_MEMORY_BUDGET_MB):
+        self.memory_budget = memory_budget_mb * 1024 * 1024 if memory_budget_mb else 0
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._load_locks: Dict[str, Lock] = {}
+        self._models: "OrderedDict[str, Any]" = OrderedDict()  # least recently used first
+        self._info: Dict[str, Dict] = {}
+        self._sizes: Dict[str, Dict[Any, int]] = {}  # bytes per storage, see _tensor_sizes
+        self._lock = Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks.setdefault(name, Lock())
+
+    def peek(self, name: str) -> Optional[Any]:
+        """Return a model only if it is already loaded (does not touch LRU order)."""
+        with self._lock:
+            return self._models.get(name)
+
+    def get(self, name: str) -> Any:
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+            load_lock = self._load_locks[name]
+            loader = self._loaders[name]
+
+        with load_lock:
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    return self._models[name]
+
+            configure_torch_threads()
+            started = time.perf_counter()
+            rss_before = _rss_bytes()
+            model = loader()
+            sizes = _tensor_sizes(model)
+            if not sizes:
+                # no torch weights to walk (ONNX Runtime session, spaCy): resident growth over the load
+                sizes = {("rss", name): max(0, _rss_bytes() - rss_before)}
+            info = {
+                "bytes": sum(sizes.values()),
+                "load_seconds": round(time.perf_counter() - started, 2),
+                "device": resolve_device()
+            }
+            with self._lock:
+                self._models[name] = model
+                self._info[name] = info
+                self._sizes[name] = sizes
+            logger.info(f"Loaded model '{name}' ({info['bytes'] / 1e6:.0f} MB in {info['load_seconds']}s)")
+
+        self._enforce_budget(keep=name)
+        return model
+
+    def unload(self, name: Optional[str] = None) -> Optional[str]:
+        """Unload `name`, or the least recently used model if no name is given."""
+        with self._lock:
+            if name is None:
+                if not self._models:
+                    return None
+                name = next(iter(self._models))
+            if self._models.pop(name, None) is None:
+                return None
+            self._info.pop(name, None)
+            self._sizes.pop(name, None)
+        _release_memory()
+        logger.info(f"Unloaded model '{name}'")
+        return name
+
+    def unload_all(self):
+        with self._lock:
+            self._models.clear()
+            self._info.clear()
+            self._sizes.clear()
+        _release_memory()
+
+    def memory_usage(self) -> Dict[str, Dict]:
+        """Per loaded model: resident bytes, load time and device, in LRU order."""
+        with self._lock:
+            return {name: dict(self._info[name]) for name in self._models}
+
+    def total_bytes(self) -> int:
+        """Resident bytes of all loaded models; storages shared between models count once."""
+        with self._lock:
+            merged = {}
+            for sizes in self._sizes.values():
+                merged.update(sizes)
+            return sum(merged.values())
+
+    def _enforce_budget(self, keep: str):
+        if not self.memory_budget:
+            return
+        while self.total_bytes() > self.memory_budget:
+            with self._lock:
+                victims = [n for n in self._models if n != keep]
+            if not victims:
+                break
+            logger.info(f"Model memory over {self.memory_budget / 1e6:.0f} MB budget")
+            self.unload(victims[0])
+
+def _release_memory():
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+registry = ModelRegistry()
 
 # === Model Loaders (Lazy Loading) ===
 
+def _backend(key: str) -> str:
+    return INFERENCE_BACKENDS.get(key, "torch")
+
+def _load_fake_news():
+    logger.info(f"Loading Fake News Model: {FAKE_NEWS_MODEL} ({_backend('fake_news')})")
+    return build_pipeline("text-classification", FAKE_NEWS_MODEL, _backend("fake_news"), resolve_device())
+
+def _load_sentiment():
+    logger.info(f"Loading Sentiment Model: {SENTIMENT_MODEL} ({_backend('sentiment')})")
+    return build_pipeline("text-classification", SENTIMENT_MODEL, _backend("sentiment"), resolve_device())
+
+def _load_nli():
+    logger.info(f"Loading NLI Model: {NLI_MODEL} ({_backend('nli')})")
+    return build_pipeline("zero-shot-classification", NLI_MODEL, _backend("nli"), resolve_device())
+
+def _load_nli_cross_encoder():
+    # Share weights with the zero-shot pipeline if it is already resident
+    nli_clf = registry.peek("nli")
+    if nli_clf is not None:
+        return (nli_clf.tokenizer, nli_clf.model)
+    logger.info(f"Loading NLI cross-encoder: {NLI_MODEL} ({_backend('nli')})")
+    return load_sequence_classifier(NLI_MODEL, _backend("nli"), resolve_device())
+
+def _load_embedding():
+    logger.info(f"Loading Embedding Model: {EMBEDDING_MODEL}")
+    return SentenceTransformer(EMBEDDING_MODEL, device=resolve_device())
+
+def _load_spacy():
+    logger.info(f"Loading Spacy Model: {SPACY_MODEL}")
+    try:
+        return spacy.load(SPACY_MODEL, disable=SPACY_DISABLED_COMPONENTS)
+    except OSError:
+        logger.warning(f"Spacy model {SPACY_MODEL} not found. Downloading...")
+        os.system(f"python -m spacy download {SPACY_MODEL}")
+        return spacy.load(SPACY_MODEL, disable=SPACY_DISABLED_COMPONENTS)
+
+registry.register("fake_news", _load_fake_news)
+registry.register("sentiment", _load_sentiment)
+registry.register("nli", _load_nli)
+registry.register("nli_cross_encoder", _load_nli_cross_encoder)
+registry.register("embedding", _load_embedding)
+registry.register("spacy", _load_spacy)
+
+def _get(name: str, label: str):
+    try:
+        return registry.get(name)
+    except Exception as e:
+        logger.error(f"Failed to load {label}: {e}")
+        raise
+
 def get_fake_news_model():
     """Load or retrieve Fake News Classification model."""
-    global _fake_news_clf
-    if _fake_news_clf is None:
-        try:
-            logger.info(f"Loading Fake News Model: {FAKE_NEWS_MODEL}")
-            _fake_news_clf = pipeline(
-                "text-classification",
-                model=FAKE_NEWS_MODEL,
-                tokenizer=FAKE_NEWS_MODEL,
-                device=0  # GPU if available, CPU otherwise
-            )
-            logger.info("Fake News model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load fake news model: {e}")
-            raise
-    return _fake_news_clf
+    return _get("fake_news", "fake news model")
 
 def get_sentiment_model():
     """Load or retrieve Sentiment Analysis model."""
-    global _sentiment_clf
-    if _sentiment_clf is None:
-        try:
-            logger.info(f"Loading Sentiment Model: {SENTIMENT_MODEL}")
-            _sentiment_clf = pipeline(
-                "text-classification",
-                model=SENTIMENT_MODEL,
-                device=0
-            )
-            logger.info("Sentiment model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load sentiment model: {e}")
-            raise
-    return _sentiment_clf
+    return _get("sentiment", "sentiment model")
 
 def get_nli_model():
     """Load or retrieve Natural Language Inference model for contradiction detection."""
-    global _nli_clf
-    if _nli_clf is None:
-        try:
-            logger.info(f"Loading NLI Model: {NLI_MODEL}")
-            _nli_clf = pipeline(
-                "zero-shot-classification",
-                model=NLI_MODEL,
-                device=0
-            )
-            logger.info("NLI model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load NLI model: {e}")
-            raise
-    return _nli_clf
+    return _get("nli", "NLI model")
+
+def get_nli_cross_encoder():
+    """
+    Load or retrieve the NLI model as a raw (tokenizer, model) pair for direct
+    premise/hypothesis scoring. Reuses the zero-shot pipeline weights if loaded.
+    """
+    return _get("nli_cross_encoder", "NLI cross-encoder")
 
 def get_embed_model():
     """Load or retrieve Sentence Embedding model for similarity analysis."""
-    global _embed_model
-    if _embed_model is None:
-        try:
-            logger.info(f"Loading Embedding Model: {EMBEDDING_MODEL}")
-            _embed_model = SentenceTransformer(EMBEDDING_MODEL)
-            logger.info("Embedding model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load embedding model: {e}")
-            raise
-    return _embed_model
+    return _get("embedding", "embedding model")
 
 def get_spacy_model():
     """Load or retrieve Spacy NLP model for NER and linguistic analysis."""
-    global _spacy_model
-    if _spacy_model is None:
-        try:
-            logger.info(f"Loading Spacy Model: {SPACY_MODEL}")
-            _spacy_model = spacy.load(SPACY_MODEL)
-            logger.info("Spacy model loaded successfully")
-        except OSError:
-            logger.warning(f"Spacy model {SPACY_MODEL} not found. Downloading...")
-            import os
-            os.system(f"python -m spacy download {SPACY_MODEL}")
-            _spacy_model = spacy.load(SPACY_MODEL)
-        except Exception as e:
-            logger.error(f"Failed to load spacy model: {e}")
-            raise
-    return _spacy_model
+    return _get("spacy", "spacy model")
 
 # === Unload functions for memory management ===
 
+def unload_model(name: Optional[str] = None) -> Optional[str]:
+    """Unload one model by registry name, or the least recently used one."""
+    return registry.unload(name)
+
 def unload_all_models():
     """Unload all models from memory."""
-    global _fake_news_clf, _sentiment_clf, _nli_clf, _embed_model, _spacy_model
-    _fake_news_clf = None
-    _sentiment_clf = None
-    _nli_clf = None
-    _embed_model = None
-    _spacy_model = None
+    registry.unload_all()
     logger.info("All models unloaded from memory")
 
+def model_memory_usage() -> Dict[str, Dict]:
+    """Resident bytes, load time and device of each loaded model."""
+    return registry.memory_usage()
+
 # === Quick initialization check ===
 
 def check_models_available():
@@ -0,0 +1,144 @@
+# rescore.py - re-weight stored events under a new risk configuration and report what changes
+"""
+Recomputes risk and alert flags for events in the store database from
+their stored `components`, without running any model, and prints a JSON
+diff against the stored scores.
+
+Usage:
+    python rescore.py --threshold 0.5
+    python rescore.py --weight fake_news=0.45 --weight virality=0 --since 2026-10-16T00:00
+    python rescore.py --calibration '{"sensational": [[0, 0.5, 1], [0, 0.2, 1]]}' --output report.json
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from config import STORE_PATH, RISK_THRESHOLD, RISK_WEIGHTS, RISK_CALIBRATION
+from risk_kernel import COMPONENTS, component_matrix, risk_scores
+
+def load_events(path: str = STORE_PATH, since: Optional[str] = None, until: Optional[str] = None,
+                limit: Optional[int] = None) -> List[Dict]:
+    """Stored events (seq, id, title, source, risk_score, components), oldest first."""
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    clauses, params = [], []
+    if since:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        clauses.append("timestamp < ?")
+        params.append(until)
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+    query = (
+        "SELECT seq, id, json_extract(data, '$.title'), source, risk_score, json_extract(data, '$.components') "
+        f"FROM events {where}ORDER BY seq" + (" LIMIT ?" if limit else "")
+    )
+    rows = db.execute(query, (*params, limit) if limit else params).fetchall()
+    db.close()
+    return [
+        {"seq": seq, "id": id_, "title": title, "source": source, "risk_score": risk,
+         "components": json.loads(comps) if comps else None}
+        for seq, id_, title, source, risk, comps in rows
+    ]
+
+def _distribution(scores: np.ndarray, bins: int = 10) -> Dict:
+    if not len(scores):
+        return {}
+    histogram, _ = np.histogram(scores, bins=bins, range=(0.0, 1.0))
+    p50, p90, p99 = np.percentile(scores, [50, 90, 99])
+    return {
+        "mean": round(float(scores.mean()), 4),
+        "p50": round(float(p50), 4),
+        "p90": round(float(p90), 4),
+        "p99": round(float(p99), 4),
+        "histogram": histogram.tolist()
+    }
+
+def _changed(events: List[Dict], idx: np.ndarray, before: np.ndarray, after: np.ndarray, top: int) -> List[Dict]:
+    # largest moves first
+    order = idx[np.argsort(-np.abs(after[idx] - before[idx]))][:top]
+    return [
+        {"seq": events[i]["seq"], "id": events[i]["id"], "title": events[i]["title"], "source": events[i]["source"],
+         "before": round(float(before[i]), 4), "after": round(float(after[i]), 4)}
+        for i in order
+    ]
+
+def rescore(events: List[Dict], weights: Dict[str, float], calibration: Dict, threshold: float,
+            baseline_threshold: float = RISK_THRESHOLD, top: int = 20) -> Dict:
+    """Diff report of re-weighted events against their stored risk and the baseline threshold."""
+    started = time.perf_counter()
+    scored = [e for e in events if e["components"] and e["risk_score"] is not None]
+    before = np.array([e["risk_score"] for e in scored], dtype=float)
+    after = risk_scores(component_matrix(e["components"] for e in scored), weights, calibration)
+
+    was_flagged = before >= baseline_threshold
+    is_flagged = after >= threshold
+    newly_flagged = np.flatnonzero(is_flagged & ~was_flagged)
+    unflagged = np.flatnonzero(was_flagged & ~is_flagged)
+    seconds = time.perf_counter() - started
+
+    delta = after - before
+    return {
+        "events": len(events),
+        "skipped_without_components": len(events) - len(scored),
+        "seconds": round(seconds, 4),
+        "events_per_second": round(len(scored) / seconds) if seconds else None,
+        "config": {
+            "weights": weights,
+            "calibration": calibration,
+            "threshold": threshold,
+            "baseline_threshold": baseline_threshold
+        },
+        "flagged": {"before": int(was_flagged.sum()), "after": int(is_flagged.sum())},
+        "newly_flagged_count": len(newly_flagged),
+        "unflagged_count": len(unflagged),
+        "newly_flagged": _changed(scored, newly_flagged, before, after, top),
+        "unflagged": _changed(scored, unflagged, before, after, top),
+        "distribution": {
+            "before": _distribution(before),
+            "after": _distribution(after),
+            "mean_shift": round(float(delta.mean()), 4) if len(delta) else 0.0,
+            "max_abs_change": round(float(np.abs(delta).max()), 4) if len(delta) else 0.0
+        }
+    }
+
+def _parse_weight(value: str):
+    name, _, weight = value.partition("=")
+    if name not in COMPONENTS or not weight:
+        raise argparse.ArgumentTypeError(f"expected <component>=<weight> with component in {COMPONENTS}")
+    return name, float(weight)
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored events under new risk weights / threshold")
+    parser.add_argument("--db", default=STORE_PATH, help="store database (config.STORE_PATH)")
+    parser.add_argument("--since", help="only events scanned at or after this ISO time")
+    parser.add_argument("--until", help="only events scanned before this ISO time")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--weight", type=_parse_weight, action="append", default=[],
+                        help="override one component weight, e.g. fake_news=0.4 (repeatable)")
+    parser.add_argument("--calibration", help="JSON object of component -> [x points, y points]")
+    parser.add_argument("--threshold", type=float, default=RISK_THRESHOLD, help="new alert threshold")
+    parser.add_argument("--baseline-threshold", type=float, default=RISK_THRESHOLD,
+                        help="threshold the stored scores were flagged with")
+    parser.add_argument("--top", type=int, default=20, help="changed items listed per direction")
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    weights = {**RISK_WEIGHTS, **dict(args.weight)}
+    calibration = {**RISK_CALIBRATION, **(json.loads(args.calibration) if args.calibration else {})}
+    started = time.perf_counter()
+    events = load_events(args.db, args.since, args.until, args.limit)
+    load_seconds = time.perf_counter() - started
+    report = rescore(events, weights, calibration, args.threshold, args.baseline_threshold, args.top)
+    report["load_seconds"] = round(load_seconds, 4)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    json.dump(report, out, indent=2)
+    out.write("\n")
+    if args.output:
+        out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# risk_kernel.py - vectorized risk scoring: component matrix -> calibrated, weighted risk per item
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from config import RISK_WEIGHTS, RISK_CALIBRATION
+
+# Column order of the component matrix
+COMPONENTS = ("fake_news", "sensational", "contradiction", "source", "virality")
+
+# Keys the components go by in result dicts (compute_risk uses source_score)
+_ALIASES = {"source": ("source", "source_score", "source_credibility")}
+
+Calibration = Dict[str, Tuple[List[float], List[float]]]
+
+def component_matrix(components: Iterable[Dict]) -> np.ndarray:
+    """
+    Stack component dicts (like compute_risk's `components`) into an
+    items x COMPONENTS float matrix. Missing or None components are NaN.
+    """
+    rows = []
+    for comp in components:
+        row = []
+        for name in COMPONENTS:
+            value = None
+            for key in _ALIASES.get(name, (name,)):
+                if comp.get(key) is not None:
+                    value = comp[key]
+                    break
+            row.append(np.nan if value is None else value)
+        rows.append(row)
+    return np.array(rows, dtype=float).reshape(len(rows), len(COMPONENTS))
+
+def risk_scores(matrix: np.ndarray, weights: Optional[Dict[str, float]] = None,
+                calibration: Optional[Calibration] = None) -> np.ndarray:
+    """
+    Risk in [0, 1] for every row of a component matrix in one pass.
+
+    Each column is mapped through its calibration curve (np.interp over the
+    configured (x, y) points; uncalibrated columns pass through), then
+    rows are averaged with `weights`. NaN components are left out and the
+    remaining weights renormalized, so an item scored without e.g.
+    contradiction isn't pulled towards zero. Rows with no components get 0.5.
+    """
+    weights = RISK_WEIGHTS if weights is None else weights
+    calibration = RISK_CALIBRATION if calibration is None else calibration
+    matrix = np.asarray(matrix, dtype=float)
+    if matrix.size == 0:
+        return np.zeros(len(matrix))
+
+    calibrated = matrix.copy()
+    for col, name in enumerate(COMPONENTS):
+        if name in calibration:
+            xs, ys = calibration[name]
+            calibrated[:, col] = np.interp(matrix[:, col], xs, ys)  # NaN stays NaN
+
+    w = np.array([weights.get(name, 0.0) for name in COMPONENTS], dtype=float)
+    present = ~np.isnan(calibrated)
+    total = present @ w
+    weighted = np.where(present, calibrated, 0.0) @ w
+    with np.errstate(invalid="ignore", divide="ignore"):
+        risk = np.where(total > 0, weighted / total, 0.5)
+    return np.clip(risk, 0.0, 1.0)
+
+def risk_from_components(components: Iterable[Dict], weights: Optional[Dict[str, float]] = None,
+                         calibration: Optional[Calibration] = None) -> List[float]:
+    """risk_scores over component dicts, e.g. stored events re-weighted without re-running models."""
+    return risk_scores(component_matrix(components), weights, calibration).tolist()
@@ -1,20 +1,39 @@
 # scorer.py - compute risk scores using real ML models
 import time
+import hashlib
+import json
 import requests
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import logging
-from config import USE_HEAVY_MODELS, WIKIPEDIA_TIMEOUT
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from requests.adapters import HTTPAdapter
+import torch
+from config import (
+    USE_HEAVY_MODELS, WIKIPEDIA_TIMEOUT, WIKIPEDIA_API_URL, SCORING_BATCH_SIZE, NLI_MODE,
+    EVIDENCE_WORKERS, EVIDENCE_DEADLINE_SECONDS, EVIDENCE_CACHE_SIZE, EVIDENCE_CACHE_TTL,
+    EVIDENCE_CACHE_NEGATIVE_TTL, EVIDENCE_CACHE_PATH, SCORE_CACHE_SIZE, SCORE_CACHE_TTL, SCORE_CACHE_PATH,
+    SCORE_CACHE_DEGRADED_TTL, INFERENCE_BACKENDS
+)
+from cache import TTLCache, content_hash
 from sentence_transformers import util
 
 # Import from our centralized models module
 from models import (
+    FAKE_NEWS_MODEL,
+    SENTIMENT_MODEL,
+    NLI_MODEL,
+    EMBEDDING_MODEL,
+    SPACY_MODEL,
     get_fake_news_model,
     get_sentiment_model,
     get_nli_model,
-    get_embed_model,
-    get_spacy_model
+    get_nli_cross_encoder,
+    get_embed_model
 )
+from analysis import analyze_doc, analyze_docs
+from risk_kernel import risk_from_components
 
 logger = logging.getLogger("ViralWarnSystem")
 
@@ -33,39 +52,77 @@ LOW_TRUST_DOMAINS = [
     "blogspot", "wordpress.com", "medium.com", "tumblr.com"
 ]
 
+# Everything a cached score depends on besides the post itself
+MODEL_VERSIONS = {
+    "fake_news": FAKE_NEWS_MODEL,
+    "sentiment": SENTIMENT_MODEL,
+    "nli": NLI_MODEL,
+    "nli_mode": NLI_MODE,
+    "embedding": EMBEDDING_MODEL,
+    "spacy": SPACY_MODEL,
+    "heavy_models": USE_HEAVY_MODELS,
+    "backends": INFERENCE_BACKENDS
+}
+_MODEL_FINGERPRINT = hashlib.sha1(json.dumps(MODEL_VERSIONS, sort_keys=True).encode()).hexdigest()[:12]
+
+_score_cache = TTLCache(
+    maxsize=SCORE_CACHE_SIZE,
+    ttl=SCORE_CACHE_TTL,
+    path=SCORE_CACHE_PATH,
+    table="scores"
+)
+
 def sensational_score(text: str) -> float:
     """
     Score text for sensationalism using both keyword matching and model inference.
     Returns float 0-1 where 1 is most sensational.
     """
-    t = text.lower()
+    return sensational_scores([text])[0]
+
+def sensational_scores(texts: List[str]) -> List[float]:
+    """
+    Batched variant of sensational_score: one padded sentiment pass for all texts.
+    """
+    return _sensational_scores(texts)[0]
+
+def _sensational_scores(texts: List[str]) -> Tuple[List[float], bool]:
+    """sensational_scores, plus whether the sentiment model failed and keywords stood in."""
+    if not texts:
+        return [], False
     
     # Keyword-based heuristic
-    kw_hits = sum(1 for k in SENSATIONAL_KEYWORDS if k in t)
-    keyword_score = min(1.0, kw_hits / 5.0)
+    keyword_scores = []
+    for text in texts:
+        t = text.lower()
+        kw_hits = sum(1 for k in SENSATIONAL_KEYWORDS if k in t)
+        keyword_scores.append(min(1.0, kw_hits / 5.0))
     
     if USE_HEAVY_MODELS:
         try:
             # Use sentiment model as proxy for sensationalism
             # Negative sentiment often correlates with sensationalism
             sentiment_clf = get_sentiment_model()
-            output = sentiment_clf(text[:256])[0]
-            label = output["label"].upper()
-            score = output["score"]
-            
-            # Negative (LABEL_0) is more sensational
-            if "LABEL_0" in label or "NEGATIVE" in label:
-                model_score = score
-            else:
-                model_score = 0.1
+            outputs = _as_list(sentiment_clf([t[:256] for t in texts], batch_size=SCORING_BATCH_SIZE))
             
-            # Combine both scores
-            return max(keyword_score, model_score * 0.8)
+            scores = []
+            for keyword_score, output in zip(keyword_scores, outputs):
+                label = output["label"].upper()
+                score = output["score"]
+                
+                # Negative (LABEL_0) is more sensational
+                if "LABEL_0" in label or "NEGATIVE" in label:
+                    model_score = score
+                else:
+                    model_score = 0.1
+                
+                # Combine both scores
+                scores.append(max(keyword_score, model_score * 0.8))
+            return scores, False
         except Exception as e:
             logger.debug(f"Error in sensational_score model inference: {e}")
-            return keyword_score
+            return keyword_scores, True
     
-    return keyword_score
+    return keyword_scores, False
 
 def source_credibility(url: str) -> float:
     """
@@ -95,22 +152,21 @@ def extract_claims(text: str, max_claims: int = 3) -> List[str]:
     Extract key claims from text using NER and sentence segmentation.
     """
     try:
-        nlp = get_spacy_model()
-        doc = nlp(text[:1000])
+        doc = analyze_doc(text)
         
         claims = []
         
         # Extract noun chunks as claims
         for nc in doc.noun_chunks:
-            s = str(nc).strip()
+            s = nc.strip()
             if 8 < len(s) < 150 and len(s.split()) <= 8:
                 claims.append(s)
         
         # If not enough claims, fall back to sentences with entities
         if len(claims) < max_claims:
-            for sent in doc.sents:
-                if any(ent for ent in sent.ents) and len(sent.text) > 15:
-                    claims.append(sent.text.strip())
+            for sent, has_ents in doc.sentences:
+                if has_ents and len(sent) > 15:
+                    claims.append(sent.strip())
         
         return claims[:max_claims]
     
@@ -120,70 +176,177 @@ def extract_claims(text: str, max_claims: int = 3) -> List[str]:
         sents = re.split(r'(?<=[.!?]) +', text)
         return [s for s in sents if len(s) > 40][:max_claims]
 
-def quick_wikipedia_search(query: str) -> dict:
+# Shared keep-alive session and worker pool for evidence lookups
+_wiki_session = None
+_wiki_session_lock = Lock()
+_evidence_pool = ThreadPoolExecutor(max_workers=EVIDENCE_WORKERS, thread_name_prefix="evidence")
+_evidence_cache = TTLCache(
+    maxsize=EVIDENCE_CACHE_SIZE,
+    ttl=EVIDENCE_CACHE_TTL,
+    path=EVIDENCE_CACHE_PATH,
+    table="evidence"
+)
+
+def _get_wiki_session() -> requests.Session:
+    """Create (once) a pooled session sized for EVIDENCE_WORKERS concurrent lookups."""
+    global _wiki_session
+    if _wiki_session is None:
+        with _wiki_session_lock:
+            if _wiki_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=EVIDENCE_WORKERS)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = "Clarifact-AI/2.0 (evidence lookup)"
+                _wiki_session = session
+    return _wiki_session
+
+def quick_wikipedia_search(query: str, timeout: float = WIKIPEDIA_TIMEOUT) -> dict:
     """
     Quick Wikipedia search for evidence verification.
+    Results (including empty ones) are cached by normalized query.
     """
+    return _wikipedia_search(query, timeout) or {}
+
+def _wikipedia_search(query: str, timeout: float = WIKIPEDIA_TIMEOUT) -> Optional[dict]:
+    """quick_wikipedia_search, but None when the lookup failed rather than found nothing."""
+    key = " ".join(query.lower().split())[:200]
+    cached = _evidence_cache.get(key)
+    if cached is not None:
+        return cached
+    
     try:
-        url = "https://en.wikipedia.org/w/api.php"
         params = {
             "action": "query",
             "list": "search",
             "srsearch": query[:200],
             "format": "json"
         }
-        r = requests.get(url, params=params, timeout=WIKIPEDIA_TIMEOUT)
+        r = _get_wiki_session().get(WIKIPEDIA_API_URL, params=params, timeout=timeout)
         
         if r.ok:
             data = r.json()
             hits = data.get("query", {}).get("search", [])
             if hits:
-                return {
+                result = {
                     "title": hits[0]["title"],
                     "snippet": hits[0].get("snippet", ""),
                     "page": "https://en.wikipedia.org/wiki/" + hits[0]["title"].replace(' ', '_')
                 }
+                _evidence_cache.set(key, result)
+                return result
+            # Negative caching: no hits is an answer too, just a shorter-lived one
+            _evidence_cache.set(key, {}, ttl=EVIDENCE_CACHE_NEGATIVE_TTL)
+            return {}
     except Exception as e:
         logger.debug(f"Wikipedia search error: {e}")
     
-    return {}
+    return None
+
+def evidence_cache_stats() -> Dict:
+    """Hit/miss counters of the Wikipedia evidence cache."""
+    return _evidence_cache.stats()
+
+class _EvidenceBudget:
+    """Per-post deadline; the clock starts when the post's first lookup runs."""
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires = None
+        self.lock = Lock()
+
+    def remaining(self) -> float:
+        with self.lock:
+            if self.expires is None:
+                self.expires = time.monotonic() + self.seconds
+            return self.expires - time.monotonic()
+
+def _budgeted_search(claim: str, budget: _EvidenceBudget) -> Optional[dict]:
+    remaining = budget.remaining()
+    if remaining <= 0:
+        return None
+    return _wikipedia_search(claim, timeout=min(WIKIPEDIA_TIMEOUT, remaining))
+
+def gather_evidence(claims_list: List[List[str]], deadline: float = EVIDENCE_DEADLINE_SECONDS) -> List[List[str]]:
+    """
+    Look up evidence snippets for every claim of every post concurrently over
+    the shared session. Each post gets `deadline` seconds of evidence budget;
+    lookups that would overrun it yield an empty snippet.
+    """
+    return _gather_evidence(claims_list, deadline)[0]
+
+def _gather_evidence(claims_list: List[List[str]],
+                     deadline: float = EVIDENCE_DEADLINE_SECONDS) -> Tuple[List[List[str]], List[bool]]:
+    """gather_evidence, plus per post whether any lookup failed or ran out of budget."""
+    futures = []
+    for claims in claims_list:
+        budget = _EvidenceBudget(deadline)
+        futures.append([_evidence_pool.submit(_budgeted_search, c, budget) for c in claims])
+    
+    found = [[fut.result() for fut in post_futures] for post_futures in futures]
+    evidence = [[(r or {}).get('snippet', "") for r in post] for post in found]
+    return evidence, [any(r is None for r in post) for post in found]
 
 def contradiction_score(claims: List[str], evidence_snippets: List[str]) -> float:
     """
     Detect contradictions between claims and evidence using NLI model.
     Returns float 0-1 where 1 means highly contradictory.
     """
-    if not claims or not evidence_snippets:
-        return 0.0
+    return contradiction_scores([claims], [evidence_snippets])[0]
+
+def contradiction_scores(claims_list: List[List[str]], evidence_list: List[List[str]]) -> List[float]:
+    """
+    Batched variant of contradiction_score. All claim/evidence pairs of all
+    posts go through the NLI model together; per-post ratios are returned.
+    """
+    return _contradiction_scores(claims_list, evidence_list)[0]
+
+def _contradiction_scores(claims_list: List[List[str]], evidence_list: List[List[str]]) -> Tuple[List[float], bool]:
+    """contradiction_scores, plus whether NLI failed and a fallback produced the scores."""
+    scores = [0.0] * len(claims_list)
+    active = [
+        i for i, (claims, evidence) in enumerate(zip(claims_list, evidence_list))
+        if claims and evidence
+    ]
+    if not active:
+        return scores, False
     
     if USE_HEAVY_MODELS:
         try:
-            nli_clf = get_nli_model()
-            contradictions = 0
-            total = 0
+            # premise is evidence, hypothesis is claim
+            premises = []
+            hypotheses = []
+            owners = []
+            for i in active:
+                for claim in claims_list[i][:3]:
+                    for evidence in evidence_list[i][:3]:
+                        if not evidence or not claim:
+                            continue
+                        premises.append(evidence)
+                        hypotheses.append(claim)
+                        owners.append(i)
             
-            for claim in claims[:3]:
-                for evidence in evidence_snippets[:3]:
-                    if not evidence or not claim:
-                        continue
-                    
-                    total += 1
-                    
-                    # Use NLI model to detect contradiction
-                    # premise is evidence, hypothesis is claim
-                    text = f"{evidence} </s> {claim}"
-                    
-                    output = nli_clf(text[:512], ["contradiction", "entailment", "neutral"])
-                    
-                    if output and len(output) > 0:
-                        # Find contradiction score
-                        for label_obj in output:
-                            if "contradiction" in label_obj.get("label", "").lower():
-                                if label_obj.get("score", 0) > 0.5:
-                                    contradictions += 1
-                                break
+            contradictions = [0] * len(claims_list)
+            totals = [0] * len(claims_list)
+            if premises:
+                if NLI_MODE == "cross_encoder":
+                    probs = nli_contradiction_probs(premises, hypotheses)
+                else:
+                    nli_clf = get_nli_model()
+                    outputs = _as_list(nli_clf(
+                        [f"{p} </s> {h}"[:512] for p, h in zip(premises, hypotheses)],
+                        candidate_labels=["contradiction", "entailment", "neutral"],
+                        batch_size=SCORING_BATCH_SIZE
+                    ))
+                    probs = [_zero_shot_label_score(o, "contradiction") for o in outputs]
+                
+                for owner, prob in zip(owners, probs):
+                    totals[owner] += 1
+                    if prob > 0.5:
+                        contradictions[owner] += 1
             
-            return (contradictions / total) if total > 0 else 0.0
+            for i in active:
+                scores[i] = (contradictions[i] / totals[i]) if totals[i] > 0 else 0.0
+            return scores, False
         
         except Exception as e:
             logger.debug(f"Error in contradiction detection: {e}")
@@ -191,116 +354,252 @@ def contradiction_score(claims: List[str], evidence_snippets: List[str]) -> floa
     # Fallback: embedding similarity
     try:
         embed_model = get_embed_model()
-        claim_embeddings = embed_model.encode(claims, convert_to_tensor=True)
-        evidence_embeddings = embed_model.encode(evidence_snippets, convert_to_tensor=True)
+        flat_claims = [c for i in active for c in claims_list[i]]
+        flat_evidence = [e for i in active for e in evidence_list[i]]
+        claim_embeddings = embed_model.encode(flat_claims, batch_size=SCORING_BATCH_SIZE, convert_to_tensor=True)
+        evidence_embeddings = embed_model.encode(flat_evidence, batch_size=SCORING_BATCH_SIZE, convert_to_tensor=True)
         
-        similarity = util.pytorch_cos_sim(claim_embeddings, evidence_embeddings).mean().item()
-        
-        # Lower similarity suggests contradiction
-        return max(0.0, min(1.0, 1.0 - similarity))
+        c_off = e_off = 0
+        for i in active:
+            n_c, n_e = len(claims_list[i]), len(evidence_list[i])
+            similarity = util.pytorch_cos_sim(
+                claim_embeddings[c_off:c_off + n_c],
+                evidence_embeddings[e_off:e_off + n_e]
+            ).mean().item()
+            c_off += n_c
+            e_off += n_e
+            
+            # Lower similarity suggests contradiction
+            scores[i] = max(0.0, min(1.0, 1.0 - similarity))
+        # embedding similarity is the normal path only without the heavy models
+        return scores, USE_HEAVY_MODELS
     
     except Exception as e:
         logger.debug(f"Error in embedding similarity: {e}")
-        return 0.0
+        return [0.0] * len(claims_list), True
+
+def nli_contradiction_probs(premises: List[str], hypotheses: List[str]) -> List[float]:
+    """
+    Direct premise/hypothesis NLI: tokenize all pairs together and read the
+    contradiction probability from the logits, one forward pass per mini-batch.
+    """
+    tokenizer, model = get_nli_cross_encoder()
+    contra_idx = next(
+        (i for i, label in model.config.id2label.items() if "contra" in label.lower()), 0
+    )
+    
+    probs = []
+    for start in range(0, len(premises), SCORING_BATCH_SIZE):
+        encoded = tokenizer(
+            premises[start:start + SCORING_BATCH_SIZE],
+            hypotheses[start:start + SCORING_BATCH_SIZE],
+            padding=True,
+            truncation=True,
+            max_length=512,
+            return_tensors="pt"
+        ).to(model.device)
+        with torch.inference_mode():
+            logits = model(**encoded).logits
+        probs.extend(logits.softmax(dim=-1)[:, contra_idx].tolist())
+    return probs
 
 def fake_news_score(text: str) -> float:
     """
     Score text likelihood of being fake news using BERT model.
     Returns float 0-1 where 1 is definitely fake.
     """
+    return fake_news_scores([text])[0]
+
+def fake_news_scores(texts: List[str]) -> List[float]:
+    """
+    Batched variant of fake_news_score: one padded forward pass per mini-batch.
+    """
+    return _fake_news_scores(texts)[0]
+
+def _fake_news_scores(texts: List[str]) -> Tuple[List[float], bool]:
+    """fake_news_scores, plus whether the model failed and 0.5 placeholders were returned."""
+    if not texts:
+        return [], False
+    
     try:
         clf = get_fake_news_model()
-        output = clf(text[:512])[0]
+        outputs = _as_list(clf([t[:512] for t in texts], batch_size=SCORING_BATCH_SIZE))
         
-        label = output["label"].upper()
-        score = output["score"]
-        
-        # If model says FAKE, return score as-is
-        # If model says REAL, return inverse
-        if "FAKE" in label:
-            return score
-        else:
-            return 1.0 - score
+        scores = []
+        for output in outputs:
+            label = output["label"].upper()
+            score = output["score"]
+            
+            # If model says FAKE, return score as-is
+            # If model says REAL, return inverse
+            scores.append(score if "FAKE" in label else 1.0 - score)
+        return scores, False
     
     except Exception as e:
         logger.error(f"Error in fake news detection: {e}")
-        return 0.5
+        return [0.5] * len(texts), True
 
-def compute_risk(post: Dict) -> Dict:
-    """
-    Comprehensive risk scoring function combining multiple ML models.
-    """
-    text = (post.get('title', '') + ". " + post.get('text', ''))[:2000]
-    url = post.get('url', '')
-    
-    try:
-        # Compute individual risk components
-        fake_score = fake_news_score(text)
-        sensational = sensational_score(text)
-        source_cred = source_credibility(url)
-        
-        claims = extract_claims(text)
-        evidence = [quick_wikipedia_search(c).get('snippet', "") for c in claims]
-        contradiction = contradiction_score(claims, evidence)
-        
-        # Virality estimation from text (look for metrics)
-        virality = 0.0
-        virality_match = re.search(r'(\d{2,})\s*(upvote|points|upvotes|score|view|like)', text.lower())
-        if virality_match:
-            val = int(virality_match.group(1))
-            virality = min(1.0, val / 10000.0)
-        
-        # Weighted combination
-        weights = {
-            'fake_news': 0.35,
-            'sensational': 0.25,
-            'contradiction': 0.20,
-            'source_credibility': 0.15,
-            'virality': 0.05
+def virality_score(text: str) -> float:
+    """Virality estimation from text (look for metrics)."""
+    virality = 0.0
+    virality_match = re.search(r'(\d{2,})\s*(upvote|points|upvotes|score|view|like)', text.lower())
+    if virality_match:
+        val = int(virality_match.group(1))
+        virality = min(1.0, val / 10000.0)
+    return virality
+
+def _as_list(outputs) -> List:
+    """HF pipelines return a bare dict for single inputs; normalize to a list."""
+    return [outputs] if isinstance(outputs, dict) else list(outputs)
+
+def _zero_shot_label_score(output: Dict, wanted: str) -> float:
+    """Read the score of one candidate label from a zero-shot pipeline output."""
+    for label, score in zip(output.get("labels", []), output.get("scores", [])):
+        if wanted in label.lower():
+            return score
+    return 0.0
+
+def _post_text(post: Dict) -> str:
+    return (post.get('title', '') + ". " + post.get('text', ''))[:2000]
+
+def _risk_results(fake: List[float], sensational: List[float], contradiction: List[float],
+                  source_cred: List[float], virality: List[float],
+                  claims_list: List[List[str]], evidence_list: List[List[str]]) -> List[Dict]:
+    """Combine per-post components into result dicts, with one risk_kernel pass for the batch."""
+    components = [
+        {
+            'fake_news': round(f, 3),
+            'sensational': round(s, 3),
+            'contradiction': round(c, 3),
+            'source_score': round(src, 3),
+            'virality': round(v, 3)
         }
-        
-        risk_score = (
-            weights['fake_news'] * fake_score +
-            weights['sensational'] * sensational +
-            weights['contradiction'] * contradiction +
-            weights['source_credibility'] * (1 - source_cred) +
-            weights['virality'] * virality
-        )
-        
-        risk_score = max(0.0, min(1.0, risk_score))
-        
-        return {
-            'risk_score': risk_score,
-            'components': {
-                'fake_news': round(fake_score, 3),
-                'sensational': round(sensational, 3),
-                'contradiction': round(contradiction, 3),
-                'source_score': round(source_cred, 3),
-                'virality': round(virality, 3)
-            },
+        for f, s, c, src, v in zip(fake, sensational, contradiction, source_cred, virality)
+    ]
+    # risk is computed from the rounded components so re-scoring stored ones reproduces it
+    risks = risk_from_components(components)
+    return [
+        {
+            'risk_score': risk,
+            'components': comp,
             'claims': claims,
             'evidence': evidence,
             'reasoning': (
-                f"Fake News: {fake_score:.2f}, "
-                f"Sensationalism: {sensational:.2f}, "
-                f"Contradiction: {contradiction:.2f}, "
-                f"Source Credibility: {source_cred:.2f}"
+                f"Fake News: {comp['fake_news']:.2f}, "
+                f"Sensationalism: {comp['sensational']:.2f}, "
+                f"Contradiction: {comp['contradiction']:.2f}, "
+                f"Source Credibility: {comp['source_score']:.2f}"
             )
         }
+        for risk, comp, claims, evidence in zip(risks, components, claims_list, evidence_list)
+    ]
+
+def with_source_credibility(result: Dict, url: str) -> Dict:
+    """
+    Copy of a compute_risk result re-weighted for another source URL, used by
+    near-duplicate variants that inherit a story's model scores.
+    """
+    c = result['components']
+    res = _risk_results(
+        [c['fake_news']], [c['sensational']], [c['contradiction']], [source_credibility(url)], [c['virality']],
+        [result.get('claims', [])], [result.get('evidence', [])]
+    )[0]
+    res['degraded'] = result.get('degraded', False)
+    return res
+
+def _fallback_result(text: str) -> Dict:
+    """Neutral score used when the scoring pipeline fails."""
+    return {
+        'risk_score': 0.5,
+        'components': {
+            'fake_news': 0.5,
+            'sensational': 0.3,
+            'contradiction': 0.2,
+            'source_score': 0.5,
+            'virality': 0.0
+        },
+        'claims': extract_claims(text),
+        'evidence': [],
+        'reasoning': "Error in analysis - using fallback score",
+        'degraded': True
+    }
+
+def compute_risk(post: Dict) -> Dict:
+    """
+    Comprehensive risk scoring function combining multiple ML models.
+    """
+    return compute_risk_batch([post])[0]
+
+def compute_risk_batch(posts: List[Dict]) -> List[Dict]:
+    """
+    Score many posts at once. Each model runs padded mini-batches of
+    SCORING_BATCH_SIZE over all posts instead of one forward pass per post.
+    Posts already scored with the current MODEL_VERSIONS (same title, text
+    and url) reuse their cached result; only new or changed posts are scored.
+    Returns one compute_risk-style dict per post, in input order.
+    """
+    if not posts:
+        return []
+    
+    keys = [f"{content_hash(p)}:{_MODEL_FINGERPRINT}" for p in posts]
+    results = [None] * len(posts)
+    for i, key in enumerate(keys):
+        cached = _score_cache.get(key)
+        if cached is not None:
+            results[i] = dict(cached["result"])
+    
+    hits = [i for i, r in enumerate(results) if r is not None]
+    if hits:
+        # cached components are re-weighted under the current RISK_WEIGHTS / RISK_CALIBRATION
+        for i, risk in zip(hits, risk_from_components([results[i]['components'] for i in hits])):
+            results[i]['risk_score'] = risk
+    
+    misses = [i for i, r in enumerate(results) if r is None]
+    if misses:
+        texts = [_post_text(posts[i]) for i in misses]
+        try:
+            scored = _score_posts(texts, [posts[i].get('url', '') for i in misses])
+            for i, res in zip(misses, scored):
+                results[i] = res
+                # a placeholder component (model down, lookup failed) must not outlive the outage
+                ttl = SCORE_CACHE_DEGRADED_TTL if res['degraded'] else None
+                _score_cache.set(keys[i], {"result": res, "models": MODEL_VERSIONS}, ttl=ttl)
+        except Exception as e:
+            logger.error(f"Error computing risk: {e}")
+            # Fallback: return neutral score (not cached)
+            for i, text in zip(misses, texts):
+                results[i] = _fallback_result(text)
+    
+    logger.info(f"Scored {len(misses)} new/changed items, reused {len(posts) - len(misses)} cached")
+    return results
+
+def _score_posts(texts: List[str], urls: List[str]) -> List[Dict]:
+    """
+    Run every model over the batch and combine the components per post.
+    Results are flagged `degraded` when any of their components is a
+    fallback value (model or evidence lookup failed) rather than a real score.
+    """
+    # Compute individual risk components
+    fake, fake_degraded = _fake_news_scores(texts)
+    sensational, sensational_degraded = _sensational_scores(texts)
+    source_cred = [source_credibility(u) for u in urls]
     
+    try:
+        analyze_docs(texts)  # one bulk spaCy pass; extract_claims reads the cached parses
     except Exception as e:
-        logger.error(f"Error computing risk: {e}")
-        # Fallback: return neutral score
-        return {
-            'risk_score': 0.5,
-            'components': {
-                'fake_news': 0.5,
-                'sensational': 0.3,
-                'contradiction': 0.2,
-                'source_score': 0.5,
-                'virality': 0.0
-            },
-            'claims': extract_claims(text),
-            'evidence': [],
-            'reasoning': "Error in analysis - using fallback score"
-        }
+        logger.debug(f"Bulk spaCy parse failed: {e}")
+    claims_list = [extract_claims(t) for t in texts]
+    evidence_list, evidence_degraded = _gather_evidence(claims_list)
+    contradiction, contradiction_degraded = _contradiction_scores(claims_list, evidence_list)
+    
+    virality = [virality_score(t) for t in texts]
+    
+    results = _risk_results(fake, sensational, contradiction, source_cred, virality, claims_list, evidence_list)
+    batch_degraded = fake_degraded or sensational_degraded or contradiction_degraded
+    for res, lookup_failed in zip(results, evidence_degraded):
+        res['degraded'] = batch_degraded or lookup_failed
+    return results
+
+def score_cache_stats() -> Dict:
+    """Hit/miss counters of the per-item scoring result cache."""
+    return _score_cache.stats()
@@ -0,0 +1,261 @@
+# storage.py - pluggable durable backends for store.py (SQLite WAL or in-memory)
+import json
+import logging
+import os
+import sqlite3
+from collections import Counter, deque
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional, Tuple
+from config import MAX_EVENTS_STORED, STORE_BACKEND, STORE_PATH, STORE_BATCH_SIZE, STORE_FLUSH_SECONDS, STORE_MAX_EVENTS
+
+logger = logging.getLogger("ViralWarnSystem")
+
+def _event_time(evt: Dict) -> str:
+    return evt.get('scanned_at') or evt.get('timestamp') or ''
+
+class StorageBackend:
+    """
+    Interface store.py writes through. Events are addressed by a
+    monotonically increasing sequence number that store.py assigns;
+    pages are returned newest first and continue from a `before` cursor.
+    """
+
+    def last_seq(self) -> int:
+        return 0
+
+    def append(self, seq: int, evt: Dict):
+        pass
+
+    def increment_geo_topic(self, loc: str, topic: str, n: int = 1):
+        pass
+
+    def query(self, limit: int = 50, before: Optional[int] = None, min_risk: Optional[float] = None,
+              source: Optional[str] = None, location: Optional[str] = None,
+              since: Optional[str] = None) -> List[Tuple[int, Dict]]:
+        return []
+
+    def geo_topic_counts(self) -> Dict[str, Dict[str, int]]:
+        return {}
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class MemoryBackend(StorageBackend):
+    """No persistence (the original behaviour): the last `maxsize` events, lost on restart."""
+
+    def __init__(self, maxsize: int = MAX_EVENTS_STORED):
+        self._events: deque = deque(maxlen=maxsize)  # (seq, event), newest first
+        self._counts: Dict[str, Counter] = {}
+
+    def append(self, seq: int, evt: Dict):
+        self._events.appendleft((seq, evt))
+
+    def increment_geo_topic(self, loc: str, topic: str, n: int = 1):
+        self._counts.setdefault(loc, Counter())[topic] += n
+
+    def query(self, limit: int = 50, before: Optional[int] = None, min_risk: Optional[float] = None,
+              source: Optional[str] = None, location: Optional[str] = None,
+              since: Optional[str] = None) -> List[Tuple[int, Dict]]:
+        rows = []
+        for seq, evt in list(self._events):
+            if ((before is None or seq < before)
+                    and (min_risk is None or (evt.get('risk_score') or 0) >= min_risk)
+                    and (source is None or evt.get('source') == source)
+                    and (location is None or evt.get('location') == location)
+                    and (since is None or _event_time(evt) >= since)):
+                rows.append((seq, evt))
+                if len(rows) == limit:
+                    break
+        return rows
+
+    def geo_topic_counts(self) -> Dict[str, Dict[str, int]]:
+        return {loc: dict(topics) for loc, topics in self._counts.items()}
+
+class SQLiteBackend(StorageBackend):
+    """
+    Events and geo/topic counts in SQLite (WAL journal, so reads never wait
+    on the writer). Writes are buffered and committed in one transaction per
+    `batch_size` events or every `flush_seconds` by a background thread.
+    Reads go through their own read-only connection and never flush; rows
+    still buffered (or being committed) are merged into their results.
+    Indexed on timestamp, risk_score, source and location; keeps at most
+    `max_events` rows (0 = unlimited).
+    """
+
+    def __init__(self, path: str = STORE_PATH, batch_size: int = STORE_BATCH_SIZE,
+                 flush_seconds: float = STORE_FLUSH_SECONDS, max_events: int = STORE_MAX_EVENTS):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.max_events = max_events
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                seq INTEGER PRIMARY KEY,
+                id TEXT,
+                timestamp TEXT,
+                risk_score REAL,
+                source TEXT,
+                location TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS events_timestamp ON events(timestamp);
+            CREATE INDEX IF NOT EXISTS events_risk ON events(risk_score);
+            CREATE INDEX IF NOT EXISTS events_source ON events(source);
+            CREATE INDEX IF NOT EXISTS events_location ON events(location);
+            CREATE TABLE IF NOT EXISTS geo_topics (
+                location TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (location, topic)
+            );
+        """)
+        self._db.commit()
+        self._lock = Lock()  # guards the writer connection; only flush() takes it
+        # WAL lets this second, read-only connection read while the writer commits
+        self._reader = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._read_lock = Lock()
+        self._pending_lock = Lock()
+        self._pending_events: List[tuple] = []
+        self._pending_counts: Counter = Counter()
+        # the batch flush() is committing right now, still visible to reads
+        self._inflight_events: List[tuple] = []
+        self._inflight_counts: Counter = Counter()
+        self._commits = 0  # bumped as each in-flight batch leaves the buffers
+        self._wake = Event()
+        self._closed = False
+        self._flush_seconds = flush_seconds
+        self._writer = Thread(target=self._writer_loop, name="store-writer", daemon=True)
+        self._writer.start()
+
+    def last_seq(self) -> int:
+        with self._read_lock:
+            row = self._reader.execute("SELECT MAX(seq) FROM events").fetchone()
+        return row[0] or 0
+
+    def append(self, seq: int, evt: Dict):
+        row = (
+            seq, evt.get('id'), _event_time(evt), evt.get('risk_score'),
+            evt.get('source'), evt.get('location'), json.dumps(evt, default=str)
+        )
+        with self._pending_lock:
+            self._pending_events.append(row)
+            full = len(self._pending_events) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def increment_geo_topic(self, loc: str, topic: str, n: int = 1):
+        with self._pending_lock:
+            self._pending_counts[(loc, topic)] += n
+
+    def flush(self):
+        """Commit everything buffered so far in one transaction."""
+        with self._lock:
+            with self._pending_lock:
+                events, self._pending_events = self._pending_events, []
+                counts, self._pending_counts = self._pending_counts, Counter()
+                self._inflight_events, self._inflight_counts = events, counts
+            if not events and not counts:
+                return
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO events (seq, id, timestamp, risk_score, source, location, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)", events
+                    )
+                    self._db.executemany(
+                        "INSERT INTO geo_topics (location, topic, count) VALUES (?, ?, ?) "
+                        "ON CONFLICT(location, topic) DO UPDATE SET count = count + excluded.count",
+                        [(loc, topic, n) for (loc, topic), n in counts.items()]
+                    )
+                    if self.max_events and events:
+                        self._db.execute("DELETE FROM events WHERE seq <= ?", (events[-1][0] - self.max_events,))
+            except Exception as e:
+                logger.error(f"Store write of {len(events)} events failed: {e}")
+            finally:
+                with self._pending_lock:
+                    self._inflight_events, self._inflight_counts = [], Counter()
+                    self._commits += 1
+
+    def _writer_loop(self):
+        while not self._closed:
+            self._wake.wait(self._flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def query(self, limit: int = 50, before: Optional[int] = None, min_risk: Optional[float] = None,
+              source: Optional[str] = None, location: Optional[str] = None,
+              since: Optional[str] = None) -> List[Tuple[int, Dict]]:
+        # read your own writes without flushing: uncommitted rows are filtered here
+        with self._pending_lock:
+            unflushed = self._inflight_events + self._pending_events
+        merged = {
+            row[0]: row[6] for row in unflushed
+            if (before is None or row[0] < before)
+            and (min_risk is None or (row[3] is not None and row[3] >= min_risk))
+            and (source is None or row[4] == source)
+            and (location is None or row[5] == location)
+            and (since is None or row[2] >= since)
+        }
+        clauses, params = [], []
+        for clause, value in (("seq < ?", before), ("risk_score >= ?", min_risk), ("source = ?", source),
+                              ("location = ?", location), ("timestamp >= ?", since)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._read_lock:
+            rows = self._reader.execute(
+                f"SELECT seq, data FROM events {where}ORDER BY seq DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        # a batch committed between the two reads shows up in both; same seq, same row
+        for seq, data in rows:
+            merged.setdefault(seq, data)
+        newest = sorted(merged.items(), reverse=True)[:limit]
+        return [(seq, json.loads(data)) for seq, data in newest]
+
+    def geo_topic_counts(self) -> Dict[str, Dict[str, int]]:
+        while True:
+            with self._pending_lock:
+                unflushed = self._inflight_counts + self._pending_counts
+                commits = self._commits
+            with self._read_lock:
+                rows = self._reader.execute("SELECT location, topic, count FROM geo_topics").fetchall()
+            with self._pending_lock:
+                # counts are additive: a batch committed in between would be counted twice
+                if self._commits == commits:
+                    break
+        counts: Dict[str, Dict[str, int]] = {}
+        for loc, topic, n in rows:
+            counts.setdefault(loc, {})[topic] = n
+        for (loc, topic), n in unflushed.items():
+            loc_counts = counts.setdefault(loc, {})
+            loc_counts[topic] = loc_counts.get(topic, 0) + n
+        return counts
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._writer.join(timeout=5)
+        self.flush()
+        with self._lock, self._read_lock:
+            self._db.close()
+            self._reader.close()
+
+def open_backend(kind: str = STORE_BACKEND) -> StorageBackend:
+    """The configured backend, falling back to memory if the database can't be opened."""
+    if kind == "sqlite":
+        try:
+            return SQLiteBackend()
+        except Exception as e:
+            logger.warning(f"SQLite store disabled ({STORE_PATH}), keeping events in memory only: {e}")
+    elif kind != "memory":
+        raise ValueError(f"Unknown STORE_BACKEND '{kind}', expected 'sqlite' or 'memory'")
+    return MemoryBackend()
@@ -1,26 +1,105 @@
-# store.py - simple in-memory store for events and counts
-from collections import deque, defaultdict
+# store.py - events and counts: in-memory ring as a read cache in front of a durable backend
+import atexit
+import time
+from datetime import datetime, timezone
 from threading import Lock
-from config import MAX_EVENTS_STORED
+from typing import Dict, Optional, Tuple
+from aggregation import RollingAggregator, Window
+from config import MAX_EVENTS_STORED, AGG_RETENTION, AGG_RESTORE_LIMIT
+from storage import open_backend
 
-_lock = Lock()
-events = deque(maxlen=MAX_EVENTS_STORED)   # most recent events
-geo_topic_counts = defaultdict(lambda: defaultdict(int))
+class Snapshot:
+    """
+    Immutable view of the store. Writers publish a new Snapshot instead of
+    mutating the current one, so readers take it without any lock.
+    `events` is a tuple of (seq, event), newest first; the event dicts are
+    shared with later snapshots and must not be mutated by readers.
+    """
+    __slots__ = ("version", "events")
+
+    def __init__(self, version: int, events: Tuple):
+        self.version = version
+        self.events = events
+
+_write_lock = Lock()  # serializes writers only; readers never take it
+backend = open_backend()
+_seq = backend.last_seq()
+# reloaded from the backend on start
+_snapshot = Snapshot(0, tuple(backend.query(limit=MAX_EVENTS_STORED)))
+# time-bucketed risk per (location, topic); all-time counts stay in the backend
+aggregates = RollingAggregator()
+
+def _event_ts(evt: Dict) -> Optional[float]:
+    try:
+        # scanned_at is naive UTC (datetime.utcnow)
+        return datetime.fromisoformat(evt['scanned_at']).replace(tzinfo=timezone.utc).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def _restore_aggregates():
+    cutoff = datetime.utcfromtimestamp(time.time() - AGG_RETENTION).isoformat()
+    for _, evt in backend.query(limit=AGG_RESTORE_LIMIT, since=cutoff):
+        ts = _event_ts(evt)
+        if ts is not None and evt.get('location') and evt.get('topic'):
+            aggregates.add(evt['location'], evt['topic'], evt.get('risk_score') or 0.0, ts)
+
+_restore_aggregates()
+
+atexit.register(backend.close)
 
 def push_event(evt: dict):
-    with _lock:
-        events.appendleft(evt)
+    global _seq, _snapshot
+    with _write_lock:
+        _seq += 1
+        current = _snapshot
+        # copy-on-write: new tuple, event dicts shared
+        _snapshot = Snapshot(current.version + 1, ((_seq, evt),) + current.events[:MAX_EVENTS_STORED - 1])
+        backend.append(_seq, evt)  # buffered; committed in batches
+
+def get_snapshot() -> Snapshot:
+    """The current snapshot; use it for several reads that must agree with each other."""
+    return _snapshot
+
+def get_version() -> int:
+    return _snapshot.version
+
+def changed_since(version: int) -> bool:
+    """True if anything was written after `version` (from get_version / Snapshot.version)."""
+    return _snapshot.version != version
 
 def get_recent(n=50):
-    with _lock:
-        return list(events)[:n]
+    cached = _snapshot.events[:n]
+    if len(cached) >= n or len(_snapshot.events) < MAX_EVENTS_STORED or not cached:
+        return [evt for _, evt in cached]
+    # older than the ring: page through the backend
+    older = backend.query(limit=n - len(cached), before=cached[-1][0])
+    return [evt for _, evt in cached + tuple(older)]
 
-def increment_geo_topic(loc: str, topic: str):
+def get_events(limit: int = 50, cursor: Optional[int] = None, min_risk: Optional[float] = None,
+               source: Optional[str] = None, location: Optional[str] = None,
+               since: Optional[str] = None) -> Dict:
+    """
+    One page of stored events, newest first, optionally filtered. Pass the
+    returned `next_cursor` back as `cursor` for the following page; it is
+    None after the last page.
+    """
+    rows = backend.query(limit=limit, before=cursor, min_risk=min_risk, source=source,
+                         location=location, since=since)
+    return {
+        "events": [evt for _, evt in rows],
+        "next_cursor": rows[-1][0] if len(rows) == limit else None
+    }
+
+def increment_geo_topic(loc: str, topic: str, risk: float = 0.0):
     if not loc or not topic:
         return
-    with _lock:
-        geo_topic_counts[loc][topic] += 1
+    aggregates.add(loc, topic, risk)
+    backend.increment_geo_topic(loc, topic)
+
+def get_geo_topic_counts(window: Window = "24h"):
+    """Items per location and topic over a sliding window (read-only; shared with the aggregate cache)."""
+    return aggregates.topic_counts(window)
 
-def get_geo_topic_counts():
-    with _lock:
-        return {loc: dict(topics) for loc, topics in geo_topic_counts.items()}
+def get_geo_risk(window: Window = "1h") -> Dict[str, Dict[str, float]]:
+    """Average / max risk and item count per location over a sliding window."""
+    return aggregates.by_location(window)
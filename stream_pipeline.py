@@ -0,0 +1,234 @@
+# stream_pipeline.py - staged fetch -> clean -> dedup -> score -> store pipeline over bounded queues
+import logging
+import queue
+import re
+import time
+from datetime import datetime
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+from config import (
+    PIPELINE_QUEUE_SIZE, PIPELINE_CLEAN_WORKERS, PIPELINE_SCORE_WORKERS,
+    PIPELINE_SCORE_BATCH, PIPELINE_BATCH_WAIT_MS
+)
+from clustering import score_clustered
+from dedup import canonicalize_url
+from fetchers import iter_all, seen_index
+from store import push_event, increment_geo_topic
+
+logger = logging.getLogger("ViralWarnSystem")
+
+_DONE = object()  # end-of-stream marker, passed from each stage to the next
+
+def clean_item(item: Dict) -> Optional[Dict]:
+    """Normalize whitespace in title/text; drop entries with neither a title nor a URL."""
+    title = re.sub(r"\s+", " ", item.get('title') or '').strip()
+    text = re.sub(r"\s+", " ", item.get('text') or '').strip()
+    if not title and not item.get('url'):
+        return None
+    return {**item, 'title': title, 'text': text}
+
+def to_event(item: Dict, res: Dict) -> Dict:
+    """Merge a scoring result into its item, ready for store.push_event."""
+    event = {**item, **res, 'scanned_at': datetime.utcnow().isoformat()}
+    # simple topic: first claim or title keywords
+    event['topic'] = (res['claims'][0] if res.get('claims') else (item.get('title') or '')).split(':')[0][:80]
+    event['location'] = "Unknown"
+    return event
+
+def store_event(event: Dict):
+    push_event(event)
+    # update geo-topic aggregates (here loc unknown -> skip)
+    increment_geo_topic(event['location'], event['topic'], event.get('risk_score') or 0.0)
+
+class StreamPipeline:
+    """
+    One fetch cycle as a chain of stages joined by bounded queues:
+
+        fetch -> clean -> dedup -> score -> store
+
+    Feeds are handed on as each one finishes downloading, and the score
+    stage flushes a micro-batch after PIPELINE_SCORE_BATCH items or
+    PIPELINE_BATCH_WAIT_MS, so the first alert is stored while slower feeds
+    are still downloading. Full queues block the stage upstream of them
+    (backpressure) instead of buffering the whole cycle in memory.
+    """
+
+    def __init__(self, sink: Callable[[Dict], None] = store_event, only_new: bool = True,
+                 include_questionable: bool = True, queue_size: int = PIPELINE_QUEUE_SIZE,
+                 clean_workers: int = PIPELINE_CLEAN_WORKERS, score_workers: int = PIPELINE_SCORE_WORKERS,
+                 score_batch: int = PIPELINE_SCORE_BATCH, batch_wait_ms: float = PIPELINE_BATCH_WAIT_MS,
+                 stop_event: Optional[Event] = None):
+        self.sink = sink
+        self.only_new = only_new
+        self.include_questionable = include_questionable
+        self.queue_size = queue_size
+        self.clean_workers = max(1, clean_workers)
+        self.score_workers = max(1, score_workers)
+        self.score_batch = max(1, score_batch)
+        self.batch_wait = batch_wait_ms / 1000.0
+        self.stop_event = stop_event or Event()
+        self._counts_lock = Lock()
+        self.counts: Dict[str, int] = {}
+
+    def _count(self, key: str, n: int = 1):
+        with self._counts_lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    # --- stages (each runs in its own thread(s)) ---
+
+    def _fetch(self, outbox: queue.Queue):
+        for _, items in iter_all(self.include_questionable):
+            if self.stop_event.is_set():
+                break
+            self._count("fetched", len(items))
+            for item in items:
+                outbox.put(item)
+
+    def _clean(self, inbox: queue.Queue, outbox: queue.Queue):
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                inbox.put(_DONE)  # let sibling workers see it too
+                return
+            cleaned = clean_item(item)
+            if cleaned is not None:
+                outbox.put(cleaned)
+
+    def _dedup(self, inbox: queue.Queue, outbox: queue.Queue):
+        # Single worker: the per-cycle URL set is not shared across threads
+        cycle_urls = set()
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            key = canonicalize_url(item.get('url', '')) or item.get('id')
+            if key in cycle_urls:
+                continue
+            cycle_urls.add(key)
+            if self.only_new and seen_index.seen(item):
+                continue
+            self._count("new")
+            outbox.put(item)
+
+    def _next_batch(self, inbox: queue.Queue) -> List:
+        """Block for one item, then take more until the batch is full or the wait expires."""
+        batch = [inbox.get()]
+        if batch[0] is _DONE:
+            return batch
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.score_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = inbox.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is _DONE:
+                break
+        return batch
+
+    def _score_items(self, items: List[Dict]) -> List[Tuple[Dict, Dict]]:
+        """(item, result) pairs; a failed batch is retried one item at a time."""
+        try:
+            # near-duplicate stories within the batch are scored once
+            return list(zip(items, score_clustered(items)))
+        except Exception as e:
+            logger.error(f"Pipeline: scoring a batch of {len(items)} failed, retrying one by one: {e}")
+        scored = []
+        for item in items:
+            try:
+                scored.append((item, score_clustered([item])[0]))
+            except Exception as e:
+                # never marked seen, so the next cycle picks it up again
+                logger.error(f"Pipeline: scoring {item.get('id')} failed: {e}")
+                self._count("failed")
+        return scored
+
+    def _score(self, inbox: queue.Queue, outbox: queue.Queue):
+        while True:
+            batch = self._next_batch(inbox)
+            done = batch[-1] is _DONE
+            items = [item for item in batch if item is not _DONE]
+            if items:
+                scored = self._score_items(items)
+                for item, res in scored:
+                    outbox.put(to_event(item, res))
+                self._count("scored", len(scored))
+            if done:
+                inbox.put(_DONE)
+                return
+
+    def _store(self, inbox: queue.Queue):
+        while True:
+            event = inbox.get()
+            if event is _DONE:
+                return
+            try:
+                self.sink(event)
+                # only stored entries count as seen; anything lost before this is retried next cycle
+                if self.only_new:
+                    seen_index.mark([event])
+                self._count("stored")
+            except Exception as e:
+                logger.error(f"Pipeline: storing {event.get('id')} failed: {e}")
+
+    # --- wiring ---
+
+    def _spawn(self, name: str, target: Callable, args: tuple, workers: int,
+               inbox: Optional[queue.Queue], outbox: Optional[queue.Queue]) -> List[Thread]:
+        """
+        Start `workers` threads running target(*args). When the last of them
+        returns, the end-of-stream marker is forwarded to `outbox`. If that
+        last one crashed, it first drains `inbox` up to the marker so the
+        stage upstream isn't left blocked on a full queue.
+        """
+        remaining = [workers]
+        lock = Lock()
+
+        def run():
+            crashed = False
+            try:
+                target(*args)
+            except Exception as e:
+                crashed = True
+                logger.error(f"Pipeline stage '{name}' crashed: {e}")
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and crashed and inbox is not None:
+                    # dropped entries were never marked seen; the next cycle retries them
+                    while inbox.get() is not _DONE:
+                        pass
+                if last and outbox is not None:
+                    outbox.put(_DONE)
+
+        threads = [Thread(target=run, name=f"pipeline-{name}-{i}", daemon=True) for i in range(workers)]
+        for t in threads:
+            t.start()
+        return threads
+
+    def run(self) -> Dict:
+        """Run one cycle to completion and return per-stage counts and its duration."""
+        started = time.monotonic()
+        self.counts = {"fetched": 0, "new": 0, "scored": 0, "failed": 0, "stored": 0}
+        raw, cleaned, fresh, scored = (queue.Queue(maxsize=self.queue_size) for _ in range(4))
+
+        threads = []
+        threads += self._spawn("fetch", self._fetch, (raw,), 1, None, raw)
+        threads += self._spawn("clean", self._clean, (raw, cleaned), self.clean_workers, raw, cleaned)
+        threads += self._spawn("dedup", self._dedup, (cleaned, fresh), 1, cleaned, fresh)
+        threads += self._spawn("score", self._score, (fresh, scored), self.score_workers, fresh, scored)
+        threads += self._spawn("store", self._store, (scored,), 1, scored, None)
+        for t in threads:
+            t.join()
+
+        report = {**self.counts, "duration": round(time.monotonic() - started, 2)}
+        logger.info(f"Pipeline cycle: {report}")
+        return report
+
+def run_cycle(**kwargs) -> Dict:
+    """Fetch, score and store one cycle of new items; see StreamPipeline."""
+    return StreamPipeline(**kwargs).run()
@@ -0,0 +1,28 @@
+# test_aggregation.py - sliding windows stop at their boundary, before and after compaction
+from types import SimpleNamespace
+import aggregation
+from aggregation import RollingAggregator
+
+def test_one_hour_window_boundary(monkeypatch):
+    # 59 minutes past the hour: the hour-aligned coarse bucket ends well inside the last hour
+    clock = SimpleNamespace(now=1_800_000_000 + 59 * 60)
+    monkeypatch.setattr(aggregation, "time", SimpleNamespace(time=lambda: clock.now))
+    agg = RollingAggregator()
+
+    def add_ago(minutes, risk):
+        agg.add("India", "topic", risk, ts=clock.now - minutes * 60)
+
+    add_ago(115, 0.9)
+    add_ago(65, 0.8)   # its 5 minute bucket ends before the window starts
+    add_ago(30, 0.1)
+    assert agg.by_location("1h")["India"]["count"] == 1
+    assert agg.by_location("24h")["India"]["count"] == 3
+
+    # 50 minutes later the older events are compacted into coarse buckets
+    clock.now += 50 * 60
+    add_ago(0, 0.3)
+    agg.compact()
+    assert any(width == agg.coarse_bucket_seconds for _, width in agg._buckets)
+    assert agg.by_location("1h")["India"] == {"avg": 0.3, "max": 0.3, "count": 1}
+    assert agg.by_location("15m")["India"]["count"] == 1
+    assert agg.by_location("24h")["India"]["count"] == 4
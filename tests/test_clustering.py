@@ -0,0 +1,55 @@
+# test_clustering.py - near-duplicates join one story across pipeline micro-batches and cycles
+import clustering
+import stream_pipeline
+from dedup import SeenIndex
+
+STORY = ("Officials confirmed on Monday that the river bridge in the northern district will close for "
+         "six months of repairs after inspectors found serious cracks in two of its main support pillars")
+
+def _filler(feed, n):
+    # unrelated texts: every word differs between items
+    words = [f"w{feed[-1]}{n}x{k}" for k in range(12)]
+    return {
+        "id": f"{feed}-{n}", "url": f"https://{feed}.example.com/{n}", "source": feed,
+        "title": " ".join(words[:4]), "text": " ".join(words[4:])
+    }
+
+def _story(feed, suffix):
+    return {"id": f"{feed}-story", "url": f"https://{feed}.example.com/story", "source": feed,
+            "title": "Bridge to close for repairs", "text": f"{STORY} {suffix}"}
+
+def _fake_score_batch(scored):
+    def score_batch(posts):
+        scored.extend(p["id"] for p in posts)
+        components = {"fake_news": 0.2, "sensational": 0.1, "contradiction": 0.0, "source_score": 0.8, "virality": 0.1}
+        return [{"risk_score": 0.2, "components": components, "claims": [], "evidence": [], "degraded": False}
+                for _ in posts]
+    return score_batch
+
+def test_duplicates_from_two_feeds_share_a_story_across_batches(monkeypatch):
+    feeds = [
+        ("feed-a", [_story("feed-a", "")] + [_filler("feed-a", n) for n in range(1, 10)]),
+        ("feed-b", [_filler("feed-b", n) for n in range(9)] + [_story("feed-b", "according to the city council")]),
+    ]
+    scored, stored = [], []
+    monkeypatch.setattr(clustering, "story_index", clustering.StoryIndex())
+    monkeypatch.setattr(clustering, "score_batch", _fake_score_batch(scored))
+    monkeypatch.setattr(stream_pipeline, "seen_index", SeenIndex(path=None))
+    monkeypatch.setattr(stream_pipeline, "iter_all", lambda include_questionable: iter(feeds))
+
+    report = stream_pipeline.run_cycle(sink=stored.append, only_new=True, score_batch=8, batch_wait_ms=50)
+    assert report["stored"] == 20
+
+    by_id = {evt["id"]: evt for evt in stored}
+    # the two variants are 10 items apart, so they were scored in different micro-batches
+    assert by_id["feed-a-story"]["story_id"] == by_id["feed-b-story"]["story_id"]
+    assert by_id["feed-b-story"]["story_size"] == 2
+    assert "feed-b-story" not in scored
+    assert len(scored) == 19
+
+    # a later cycle's variant joins the same story without being scored again
+    feeds[:] = [("feed-c", [_story("feed-c", "said a spokesperson")])]
+    stream_pipeline.run_cycle(sink=stored.append, only_new=True, batch_wait_ms=50)
+    assert stored[-1]["story_id"] == by_id["feed-a-story"]["story_id"]
+    assert stored[-1]["story_size"] == 3
+    assert len(scored) == 19
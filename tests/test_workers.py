@@ -0,0 +1,44 @@
+# test_workers.py - the scoring pool recovers when a worker process dies
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+import workers
+
+def _no_preload(torch_threads):
+    pass
+
+def _fake_score(posts):
+    return [{"id": p["id"], "risk_score": 0.5} for p in posts]
+
+def _kill_a_worker(pool):
+    os.kill(pool.submit(os.getpid).result(timeout=60), signal.SIGKILL)
+    # wait until the executor notices
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            pool.submit(os.getpid).result(timeout=30)
+        except BrokenProcessPool:
+            return
+        time.sleep(0.1)
+    pytest.fail("pool never reported the killed worker")
+
+def test_next_batch_scores_after_worker_killed(monkeypatch):
+    monkeypatch.setattr(workers, "SCORING_WORKERS", 2)
+    monkeypatch.setattr(workers, "_init_worker", _no_preload)
+    monkeypatch.setattr(workers, "_score_chunk", _fake_score)
+    workers.shutdown_pool()
+    try:
+        broken = workers.get_pool()
+        _kill_a_worker(broken)
+
+        posts = [{"id": str(i), "title": f"post {i}"} for i in range(10)]
+        results = workers.score_batch(posts)
+        assert [r["id"] for r in results] == [p["id"] for p in posts]
+        assert workers.get_pool() is not broken
+
+        # and the replacement pool keeps working
+        assert [r["id"] for r in workers.score_batch(posts)] == [p["id"] for p in posts]
+    finally:
+        workers.shutdown_pool()
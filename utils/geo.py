@@ -1,15 +1,151 @@
+# utils/geo.py - domain -> country resolution: offline tables and cache first, network only as a fallback
+import asyncio
+import logging
+import socket
+import weakref
+from typing import Dict, Tuple
+import aiohttp
 import tldextract
-import requests
+from cache import TTLCache
+from config import (
+    GEO_CACHE_PATH, GEO_CACHE_SIZE, GEO_CACHE_TTL, GEO_NEGATIVE_TTL,
+    GEO_LOOKUP_TIMEOUT, GEO_MAX_CONCURRENT_LOOKUPS, GEOIP_DB_PATH
+)
+
+logger = logging.getLogger("ViralWarnSystem")
+
+UNKNOWN = "unknown"
+
+# Country-code TLDs (last label of the public suffix, e.g. "co.uk" -> "uk")
+CCTLD_COUNTRIES = {
+    "in": "India", "uk": "United Kingdom", "us": "United States", "ca": "Canada",
+    "au": "Australia", "nz": "New Zealand", "ie": "Ireland", "de": "Germany",
+    "fr": "France", "es": "Spain", "it": "Italy", "pt": "Portugal", "nl": "Netherlands",
+    "be": "Belgium", "ch": "Switzerland", "at": "Austria", "se": "Sweden", "no": "Norway",
+    "dk": "Denmark", "fi": "Finland", "pl": "Poland", "cz": "Czechia", "gr": "Greece",
+    "ru": "Russia", "ua": "Ukraine", "tr": "Turkey", "il": "Israel", "ae": "United Arab Emirates",
+    "sa": "Saudi Arabia", "qa": "Qatar", "eg": "Egypt", "ng": "Nigeria", "ke": "Kenya",
+    "za": "South Africa", "pk": "Pakistan", "bd": "Bangladesh", "lk": "Sri Lanka", "np": "Nepal",
+    "cn": "China", "hk": "Hong Kong", "tw": "Taiwan", "jp": "Japan", "kr": "South Korea",
+    "sg": "Singapore", "my": "Malaysia", "id": "Indonesia", "ph": "Philippines", "th": "Thailand",
+    "vn": "Vietnam", "br": "Brazil", "ar": "Argentina", "mx": "Mexico", "cl": "Chile",
+}
+
+# Publishers on generic TLDs (.com/.org/...), by registered domain
+PUBLISHER_COUNTRIES = {
+    "apnews.com": "United States", "npr.org": "United States", "nytimes.com": "United States",
+    "washingtonpost.com": "United States", "cnn.com": "United States", "foxnews.com": "United States",
+    "nbcnews.com": "United States", "cbsnews.com": "United States", "abcnews.go.com": "United States",
+    "usatoday.com": "United States", "wsj.com": "United States", "bloomberg.com": "United States",
+    "politico.com": "United States", "breitbart.com": "United States", "infowars.com": "United States",
+    "naturalnews.com": "United States", "tmz.com": "United States", "reddit.com": "United States",
+    "theguardian.com": "United Kingdom", "reuters.com": "United Kingdom", "reutersagency.com": "United Kingdom",
+    "bbc.com": "United Kingdom", "independent.co.uk": "United Kingdom", "dailymail.co.uk": "United Kingdom",
+    "economist.com": "United Kingdom", "ft.com": "United Kingdom", "aljazeera.com": "Qatar",
+    "dw.com": "Germany", "france24.com": "France", "rt.com": "Russia", "scmp.com": "Hong Kong",
+    "ndtv.com": "India", "indiatimes.com": "India", "thehindu.com": "India", "indianexpress.com": "India",
+    "hindustantimes.com": "India", "deccanherald.com": "India", "news18.com": "India",
+    "livemint.com": "India", "firstpost.com": "India", "thewire.in": "India", "scroll.in": "India",
+}
+
+# Bundled public suffix list only: never fetch it over the network
+_extract = tldextract.TLDExtract(suffix_list_urls=())
+_cache = TTLCache(maxsize=GEO_CACHE_SIZE, ttl=GEO_CACHE_TTL, path=GEO_CACHE_PATH, table="geo")
+# event loop -> (lookup semaphore, domain -> in-flight lookup task); asyncio objects are bound to one loop
+_loops: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_geoip_reader = None
+
+def registered_domain(url: str) -> str:
+    return _extract(url).registered_domain.lower() if url else ""
+
+def offline_country(url: str) -> str:
+    """Country from the bundled publisher and ccTLD tables, or "unknown"."""
+    ext = _extract(url)
+    domain = ext.registered_domain.lower()
+    if domain in PUBLISHER_COUNTRIES:
+        return PUBLISHER_COUNTRIES[domain]
+    if ext.suffix:
+        return CCTLD_COUNTRIES.get(ext.suffix.lower().rsplit(".", 1)[-1], UNKNOWN)
+    return UNKNOWN
 
 def detect_geolocation(url):
+    """
+    Country of a URL's publisher from the offline tables or the lookup cache.
+    Never touches the network; unresolved domains are "unknown".
+    """
     if not url:
-        return "unknown"
+        return UNKNOWN
+    country = offline_country(url)
+    if country != UNKNOWN:
+        return country
+    return _cache.get(registered_domain(url), UNKNOWN)
+
+def _geoip_country(ip: str) -> str:
+    global _geoip_reader
+    if not GEOIP_DB_PATH:
+        return UNKNOWN
+    try:
+        if _geoip_reader is None:
+            import geoip2.database  # optional dependency
+            _geoip_reader = geoip2.database.Reader(GEOIP_DB_PATH)
+        return _geoip_reader.country(ip).country.name or UNKNOWN
+    except Exception as e:
+        logger.debug(f"GeoIP lookup of {ip} failed: {e}")
+        return UNKNOWN
 
-    domain = tldextract.extract(url).registered_domain
+def _loop_state() -> Tuple[asyncio.Semaphore, Dict[str, asyncio.Task]]:
+    """Lookup semaphore and in-flight lookups of the running loop, created on its first lookup."""
+    loop = asyncio.get_running_loop()
+    state = _loops.get(loop)
+    if state is None:
+        state = _loops[loop] = (asyncio.Semaphore(GEO_MAX_CONCURRENT_LOOKUPS), {})
+    return state
+
+async def _network_country(domain: str) -> str:
+    """DNS -> local GeoIP database if configured, else ipapi.co; bounded and time-limited."""
+    semaphore, _ = _loop_state()
+    async with semaphore:
+        try:
+            infos = await asyncio.wait_for(
+                asyncio.get_running_loop().getaddrinfo(domain, 443, type=socket.SOCK_STREAM),
+                GEO_LOOKUP_TIMEOUT
+            )
+            ip = infos[0][4][0]
+            country = _geoip_country(ip)
+            if country != UNKNOWN:
+                return country
+            timeout = aiohttp.ClientTimeout(total=GEO_LOOKUP_TIMEOUT)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(f"https://ipapi.co/{ip}/json") as res:
+                    if res.status == 200:
+                        data = await res.json()
+                        return data.get("country_name") or UNKNOWN
+        except Exception as e:
+            logger.debug(f"Geolocation lookup of {domain} failed: {e}")
+        return UNKNOWN
+
+async def _lookup(domain: str) -> str:
     try:
-        res = requests.get(f"https://ipapi.co/{domain}/json")
-        if res.ok:
-            data = res.json()
-            return data.get("country_name", "unknown")
-    except:
-        return "unknown"
+        country = await _network_country(domain)
+        _cache.set(domain, country, ttl=None if country != UNKNOWN else GEO_NEGATIVE_TTL)
+        return country
+    finally:
+        _loop_state()[1].pop(domain, None)
+
+async def detect_geolocation_async(url, wait: bool = False) -> str:
+    """
+    detect_geolocation, with a network lookup for domains it can't resolve.
+    With wait=False the lookup only warms the cache in the background and
+    this call returns "unknown" straight away; with wait=True it awaits the
+    lookup (at most GEO_LOOKUP_TIMEOUT per step). Concurrent calls for the
+    same domain share one lookup.
+    """
+    country = detect_geolocation(url)
+    domain = registered_domain(url)
+    if country != UNKNOWN or not domain or domain in _cache:
+        return country
+    _, pending = _loop_state()
+    task = pending.get(domain)
+    if task is None:
+        task = pending[domain] = asyncio.get_running_loop().create_task(_lookup(domain))
+    return await task if wait else UNKNOWN
@@ -0,0 +1,126 @@
+# workers.py - process-pool scoring so compute_risk_batch can use every core
+import atexit
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import SCORING_WORKERS, WORKER_TORCH_THREADS, SCORING_CHUNK_SIZE, NLI_MODE, USE_HEAVY_MODELS
+from models import (
+    configure_torch_threads, get_fake_news_model, get_sentiment_model,
+    get_nli_model, get_nli_cross_encoder, get_spacy_model
+)
+from scorer import compute_risk_batch
+
+logger = logging.getLogger("ViralWarnSystem")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+def _torch_threads_per_worker(workers: int) -> int:
+    """WORKER_TORCH_THREADS, or an even share of the cores so workers don't oversubscribe."""
+    if WORKER_TORCH_THREADS:
+        return WORKER_TORCH_THREADS
+    return max(1, (os.cpu_count() or 1) // workers)
+
+def _init_worker(torch_threads: int):
+    """Runs once in each worker process: pin torch threads and load the models."""
+    configure_torch_threads(torch_threads)
+    try:
+        get_spacy_model()
+        get_fake_news_model()
+        if USE_HEAVY_MODELS:
+            get_sentiment_model()
+            if NLI_MODE == "cross_encoder":
+                get_nli_cross_encoder()
+            else:
+                get_nli_model()
+    except Exception as e:
+        # scorer falls back per component; a worker without a model still works
+        logger.error(f"Worker {os.getpid()} failed to preload models: {e}")
+
+def _score_chunk(posts: List[Dict]) -> List[Dict]:
+    return compute_risk_batch(posts)
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared scoring pool, started on first use; None when SCORING_WORKERS is 0."""
+    global _pool
+    if SCORING_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            threads = _torch_threads_per_worker(SCORING_WORKERS)
+            logger.info(f"Starting {SCORING_WORKERS} scoring workers ({threads} torch threads each)")
+            _pool = ProcessPoolExecutor(
+                max_workers=SCORING_WORKERS,
+                # spawn: forking a process that already holds torch/OpenMP state is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,)
+            )
+    return _pool
+
+def shutdown_pool(pool: Optional[ProcessPoolExecutor] = None):
+    """
+    Shut down the shared pool so the next get_pool() starts a fresh one.
+    With `pool`, only if that is still the shared pool (another thread may
+    already have replaced a broken one).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and (pool is None or pool is _pool):
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+atexit.register(shutdown_pool)
+
+def iter_scored(posts: List[Dict], chunk_size: int = SCORING_CHUNK_SIZE) -> Iterator[Tuple[int, Dict]]:
+    """
+    Yield (index, compute_risk result) pairs as soon as each chunk finishes.
+    Chunks go to the worker pool, or are scored in-process when it is disabled.
+    If a worker process dies the pool is broken for good, so it is replaced
+    and only the chunks lost with it are re-scored (in-process if the new
+    pool breaks too).
+    """
+    pending = [(start, posts[start:start + chunk_size]) for start in range(0, len(posts), chunk_size)]
+
+    for _ in range(2):
+        pool = get_pool()
+        if pool is None or not pending:
+            break
+        lost = []
+        try:
+            futures = {pool.submit(_score_chunk, chunk): (start, chunk) for start, chunk in pending}
+        except BrokenProcessPool as e:
+            logger.error(f"Scoring pool is broken, restarting it: {e}")
+            shutdown_pool(pool)
+            continue
+        for fut in as_completed(futures):
+            start, chunk = futures[fut]
+            try:
+                results = fut.result()
+            except BrokenProcessPool:
+                lost.append((start, chunk))
+                continue
+            except Exception as e:
+                logger.error(f"Scoring worker failed on a chunk of {len(chunk)}, scoring in-process: {e}")
+                results = _score_chunk(chunk)
+            for offset, result in enumerate(results):
+                yield start + offset, result
+        pending = lost
+        if lost:
+            logger.error(f"A scoring worker died, restarting the pool to re-score {len(lost)} chunks")
+            shutdown_pool(pool)
+
+    for start, chunk in pending:
+        for offset, result in enumerate(_score_chunk(chunk)):
+            yield start + offset, result
+
+def score_batch(posts: List[Dict]) -> List[Dict]:
+    """compute_risk_batch spread over the worker pool; results in input order."""
+    results: List[Optional[Dict]] = [None] * len(posts)
+    for idx, result in iter_scored(posts):
+        results[idx] = result
+    return results